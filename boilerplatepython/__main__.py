@@ -1,43 +1,158 @@
 #!/usr/bin/env -S python3 -u
 """CLI entry point."""
 import argparse
+import hashlib
+import importlib
 import logging
 import os
 import signal
 import sys
+import tempfile
+import threading
+from pathlib import Path
 from shutil import get_terminal_size
 from types import FrameType
-from typing import Iterable, Tuple
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from boilerplatepython import __version__
-from boilerplatepython.conf import Config
-from boilerplatepython.logging import setup_logging
+from boilerplatepython.completion import CompletionAction
+from boilerplatepython.conf import Config, load_config, parse_color, parse_log_server
+from boilerplatepython.jobs import JobRunner
+from boilerplatepython.logging import flush_logging, SAMPLING_FILTER, setup_logging, WARNINGS_ROUTER
+from boilerplatepython.spans import span, SPANS
+
+# Built in subcommands: name -> ("module:function", "help text"). Modules are only imported when the subcommand is invoked.
+SUBCOMMANDS: Dict[str, Tuple[str, str]] = {}
+SUBCOMMANDS_ENTRY_POINT_GROUP = "boilerplatepython.subcommands"
 
 
 class ExitSignaling:
     """Gracefully exit on OS signals.
 
     :ivar exit_code: Exit with this code.
+    :ivar stopping: Set when exiting, for cooperative cancellation of work in other threads (e.g. JobRunner).
+    :ivar signaled: Exiting because of a signal, not logged yet.
+    :ivar callbacks: Called by shutdown() in reverse order of registration (e.g. to flush reports).
     """
 
     def __init__(self, initial_exit_code: int = 0):
         """Class constructor."""
         self.exit_code = initial_exit_code
+        self.stopping = threading.Event()
+        self.signaled = False
+        self.callbacks: List[Callable[[], None]] = []
 
     def exit(self, signum: int, _: FrameType):
-        """Gracefully stop the program."""
-        self.exit_code = 128 + signum
+        """Gracefully stop the program, signal handler.
 
-        # Quit.
-        logging.getLogger(__name__).info("QUITTING %d", self.exit_code)
+        Doesn't log: handlers may take locks the interrupted code was holding, shutdown() logs instead.
+        """
+        self.exit_code = 128 + signum
+        self.signaled = True
+        self.stopping.set()
         sys.exit(self.exit_code)
 
+    def shutdown(self):
+        """Run shutdown callbacks once, from the main thread after unwinding (not from the signal handler).
+
+        Callbacks may take locks the interrupted code was holding, so they must not run inside the signal handler.
+        """
+        self.stopping.set()
+        if self.signaled:
+            self.signaled = False
+            logging.getLogger(__name__).info("QUITTING %d", self.exit_code)
+        while self.callbacks:
+            callback = self.callbacks.pop()
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                logging.getLogger(__name__).exception("Shutdown callback failed: %r", callback)
+
     def register(self):
         """Register signal handlers."""
         signal.signal(signal.SIGINT, self.exit)
         signal.signal(signal.SIGTERM, self.exit)
 
 
+class ReloadSignaling:
+    """Reload configuration on SIGHUP.
+
+    The signal handler only wakes up a reload thread through a pipe, callbacks run outside the signal handler since
+    they may take locks the interrupted code was holding. The new snapshot replaces the current one only after all
+    callbacks succeeded.
+
+    :ivar config: Current configuration snapshot, replaced as a whole on reload.
+    :ivar callbacks: Called with the new snapshot after reloading (e.g. to reapply logging settings).
+    """
+
+    def __init__(self, config: Config, callbacks: Iterable[Callable[[Config], None]] = ()):
+        """Class constructor."""
+        self.config = config
+        self.callbacks = list(callbacks)
+        self._wake_fds: Optional[Tuple[int, int]] = None
+        self._worker: Optional[threading.Thread] = None
+
+    def reload(self) -> bool:
+        """Reload configuration, keeping the current one if the new one is invalid or a callback fails.
+
+        On failure the callbacks are called again with the current configuration to undo partially applied changes.
+
+        :return: True if the new configuration was applied.
+        """
+        log = logging.getLogger(__name__)
+        try:
+            config = self.config.reload()
+        except (OSError, ValueError) as exc:
+            log.error("Failed to reload configuration, keeping current one: %s", exc)
+            return False
+        try:
+            for callback in self.callbacks:
+                callback(config)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Failed to apply reloaded configuration, keeping current one")
+            for callback in self.callbacks:
+                try:
+                    callback(self.config)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception("Failed to restore configuration: %r", callback)
+            return False
+        self.config = config
+        log.info("Reloaded configuration")
+        return True
+
+    def request_reload(self, *_):
+        """Signal handler, wake up the reload thread (writing to a pipe is safe in signal handlers)."""
+        try:
+            os.write(self._wake_fds[1], b"\0")
+        except OSError:
+            pass  # Pipe full, reloads are already pending.
+
+    def _run(self):
+        """Reload thread, reload once per batch of wake ups until the pipe is closed."""
+        while os.read(self._wake_fds[0], 512):
+            self.reload()
+
+    def register(self):
+        """Start the reload thread and register the signal handler, not available on Windows."""
+        if not hasattr(signal, "SIGHUP") or self._worker is not None:
+            return
+        self._wake_fds = os.pipe()
+        os.set_blocking(self._wake_fds[1], False)
+        self._worker = threading.Thread(target=self._run, name="ReloadSignaling", daemon=True)
+        self._worker.start()
+        signal.signal(signal.SIGHUP, self.request_reload)
+
+    def unregister(self):
+        """Restore the default signal handler and stop the reload thread, after finishing a reload in progress."""
+        if self._worker is None:
+            return
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        os.close(self._wake_fds[1])
+        self._worker.join()
+        os.close(self._wake_fds[0])
+        self._worker = self._wake_fds = None
+
+
 class WideHelpFormatter(argparse.HelpFormatter):
     """Custom formatting for the CLI help menu.
 
@@ -52,12 +167,17 @@ class WideHelpFormatter(argparse.HelpFormatter):
     def __init__(self, prog, indent_increment=2, max_help_position=31, width=None):
         """Class constructor."""
         if width is None:
-            try:
-                width = int(self.OS_ENVIRON["COLUMNS"])  # Copied from HelpFormatter code.
-            except (KeyError, ValueError):
-                width = min(get_terminal_size().columns, self.MAX_DEFAULT_WIDTH)
+            width = self.default_width()
         super().__init__(prog, indent_increment, max_help_position, width)
 
+    @classmethod
+    def default_width(cls) -> int:
+        """Return $COLUMNS, otherwise the terminal width up to MAX_DEFAULT_WIDTH."""
+        try:
+            return int(cls.OS_ENVIRON["COLUMNS"])  # Copied from HelpFormatter code.
+        except (KeyError, ValueError):
+            return min(get_terminal_size().columns, cls.MAX_DEFAULT_WIDTH)
+
     @property
     def width(self) -> int:
         """Public getter method for private attribute."""
@@ -87,15 +207,255 @@ class WideHelpFormatter(argparse.HelpFormatter):
         super().add_arguments(sorted(actions, key=self.rank_argument_lower_first))
 
 
-def cli(args: Iterable[str] = None) -> Config:
+def cache_home() -> Optional[Path]:
+    """Return the directory holding the program's caches, None without one (no XDG_CACHE_HOME and no home directory)."""
+    try:
+        return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "boilerplatepython"
+    except (KeyError, RuntimeError):  # E.g. running as a user without a passwd entry and no HOME.
+        return None
+
+
+def write_cache(path: Path, text: str, max_entries: int):
+    """Atomically write a cache entry and remove the oldest entries in its directory past max_entries.
+
+    Caching is best effort, errors (e.g. a read-only home directory) are ignored.
+
+    :param path: Cache entry.
+    :param text: Contents.
+    :param max_entries: Number of entries to keep.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf8", dir=path.parent, delete=False) as handle:
+            handle.write(text)
+        os.replace(handle.name, path)  # Atomic, concurrent readers never see partial files.
+        entries = sorted(path.parent.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+        for entry in entries[max_entries:]:
+            entry.unlink()
+    except OSError:
+        pass
+
+
+class CachedHelpParser(argparse.ArgumentParser):
+    """Cache rendered help and usage text on disk, skipping the formatter entirely on cache hits.
+
+    Cache entries are keyed by the program version, the help width, and the parser's definition, so changing any of them
+    misses the cache instead of printing stale text. Caching is best effort, unreadable or read-only cache directories
+    just mean rendering every time.
+    """
+
+    MAX_CACHE_ENTRIES = 32  # Oldest entries are removed past this.
+
+    @staticmethod
+    def cache_dir() -> Optional[Path]:
+        """Return the directory holding cached help text, None without a cache directory."""
+        home = cache_home()
+        return None if home is None else home / "help"
+
+    def definition(self) -> tuple:
+        """Summarize everything the rendered text depends on, including sub-parsers."""
+        actions = []
+        for action in self._actions:
+            sub_parsers = ()
+            if isinstance(action, argparse._SubParsersAction):  # pylint: disable=protected-access
+                sub_parsers = tuple(
+                    (name, p.definition() if isinstance(p, CachedHelpParser) else repr(p))
+                    for name, p in action.choices.items()
+                )
+            actions.append(
+                (
+                    type(action).__name__,
+                    action.option_strings,
+                    action.dest,
+                    action.nargs,
+                    action.required,
+                    repr(action.default),
+                    repr(action.choices) if not sub_parsers else sub_parsers,
+                    action.help,
+                    action.metavar,
+                )
+            )
+        # pylint: disable=protected-access
+        groups = [(g.title, g.description, [self._actions.index(a) for a in g._group_actions]) for g in self._action_groups]
+        exclusive = [[self._actions.index(a) for a in g._group_actions] for g in self._mutually_exclusive_groups]
+        formatter = (self.formatter_class.__module__, self.formatter_class.__qualname__)
+        return self.prog, self.usage, self.description, self.epilog, formatter, actions, groups, exclusive
+
+    def _cache_path(self, kind: str) -> Optional[Path]:
+        """Return the cache file of the current definition and width, None without a cache directory."""
+        cache_dir = self.cache_dir()
+        if cache_dir is None:
+            return None
+        default_width = getattr(self.formatter_class, "default_width", None)
+        width = default_width() if default_width else get_terminal_size().columns
+        key = repr((__version__, width, self.definition())).encode("utf8")
+        return cache_dir / f"{hashlib.sha256(key).hexdigest()}.{kind}"
+
+    def _cached(self, kind: str, render: Callable[[], str]) -> str:
+        """Read rendered text from the cache, rendering and caching it on a miss."""
+        path = self._cache_path(kind)
+        if path is None:
+            return render()
+        try:
+            return path.read_text(encoding="utf8")
+        except (OSError, UnicodeDecodeError):
+            pass
+        text = render()
+        write_cache(path, text, self.MAX_CACHE_ENTRIES)
+        return text
+
+    def format_usage(self) -> str:
+        """Return cached usage text."""
+        return self._cached("usage", super().format_usage)
+
+    def format_help(self) -> str:
+        """Return cached help text."""
+        return self._cached("help", super().format_help)
+
+
+class Subcommand(NamedTuple):
+    """A subcommand known by name without importing its implementation."""
+
+    name: str
+    target: str
+    help: str
+
+
+class SubcommandRegistry:
+    """Register subcommands cheaply and import their implementations only when invoked.
+
+    * Subcommands come from a manifest (like SUBCOMMANDS) or from installed packages' entry points.
+    * Discovered entry points are cached on disk until a sys.path directory changes (e.g. a package is installed),
+      scanning package metadata costs tens of milliseconds on every start otherwise.
+    * Each subcommand gets a sub-parser that passes all of its arguments through to the implementation.
+    * Implementations are called with the Config and their argument list and may return an exit code.
+    """
+
+    MAX_CACHE_ENTRIES = 8  # Oldest entries are removed past this.
+
+    def __init__(self, manifest: Optional[Dict[str, Tuple[str, str]]] = None):
+        """Class constructor.
+
+        :param manifest: Subcommand names mapped to ("module:function", "help text").
+        """
+        self.subcommands: Dict[str, Subcommand] = {}
+        for name, (target, help_text) in (manifest or {}).items():
+            self.register(name, target, help_text)
+
+    def __len__(self) -> int:
+        """Return number of registered subcommands."""
+        return len(self.subcommands)
+
+    def register(self, name: str, target: str, help_text: str = ""):
+        """Register a subcommand.
+
+        :param name: Subcommand name on the command line.
+        :param target: Implementation as "module:function", imported on invocation.
+        :param help_text: Help text for the CLI help menu.
+        """
+        if ":" not in target:
+            raise ValueError(f"Invalid subcommand target, expected module:function: {target}")
+        self.subcommands[name] = Subcommand(name, target, help_text)
+
+    def discover(self, group: str = SUBCOMMANDS_ENTRY_POINT_GROUP) -> "SubcommandRegistry":
+        """Register subcommands advertised by installed packages' entry points without loading them.
+
+        :param group: Entry point group name.
+
+        :return: Self for chaining.
+        """
+        home = cache_home()
+        if home is None:
+            found = self._scan_entry_points(group)
+        else:
+            found = self._cached_entry_points(home, group)
+        for name, value in found:
+            if name not in self.subcommands:
+                self.register(name, value)
+        return self
+
+    def _cached_entry_points(self, home: Path, group: str) -> List[Tuple[str, str]]:
+        """Read entry points from the cache, keyed on sys.path directories' modification times, scanning on a miss."""
+        path_mtimes = []
+        for entry in sys.path:
+            try:
+                path_mtimes.append((entry, os.stat(entry or ".").st_mtime_ns))
+            except OSError:
+                path_mtimes.append((entry, None))
+        key = repr((__version__, group, path_mtimes)).encode("utf8")
+        cache_path = home / "entry_points" / hashlib.sha256(key).hexdigest()
+        try:
+            return [tuple(line.split("\t")) for line in cache_path.read_text(encoding="utf8").splitlines()]
+        except (OSError, UnicodeDecodeError):
+            pass
+        found = self._scan_entry_points(group)
+        write_cache(cache_path, "".join(f"{name}\t{value}\n" for name, value in found), self.MAX_CACHE_ENTRIES)
+        return found
+
+    @staticmethod
+    def _scan_entry_points(group: str) -> List[Tuple[str, str]]:
+        """Read entry points from installed packages' metadata, without loading them."""
+        try:
+            from importlib.metadata import entry_points  # pylint: disable=import-outside-toplevel
+        except ImportError:  # Python 3.7.
+            return []
+        found = entry_points()
+        selected = found.select(group=group) if hasattr(found, "select") else found.get(group, ())
+        return [(entry_point.name, entry_point.value) for entry_point in selected]
+
+    def add_parsers(self, parser: argparse.ArgumentParser):
+        """Add a sub-parser for each subcommand.
+
+        :param parser: Parent parser.
+        """
+        if not self.subcommands:
+            return
+        sub_parsers = parser.add_subparsers(dest="command", metavar="COMMAND", help="subcommand to run")
+        for name in sorted(self.subcommands):
+            help_text = self.subcommands[name].help
+            sub_parser = sub_parsers.add_parser(
+                name,
+                add_help=False,  # Implementation handles --help.
+                description=help_text,
+                formatter_class=parser.formatter_class,
+                help=help_text,
+                prefix_chars="\0",  # Treat every argument as positional so they're all passed through.
+            )
+            sub_parser.add_argument("command_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+
+    def load(self, name: str) -> Callable[[Config, List[str]], Optional[int]]:
+        """Import a subcommand's implementation.
+
+        :param name: Subcommand name.
+
+        :return: The implementation function.
+        """
+        module_name, _, attributes = self.subcommands[name].target.partition(":")
+        implementation = importlib.import_module(module_name)
+        for attribute in attributes.split("."):
+            implementation = getattr(implementation, attribute)
+        return implementation
+
+    def invoke(self, config: Config) -> Optional[int]:
+        """Run the subcommand selected on the command line.
+
+        :param config: Parsed configuration.
+
+        :return: Exit code returned by the implementation.
+        """
+        return self.load(config.command)(config, list(config.command_args))
+
+
+def cli(args: Iterable[str] = None, registry: Optional[SubcommandRegistry] = None) -> Config:
     """Parse arguments from the CLI.
 
     :param args: Arguments to parse (default: sys.argv[1:]).
+    :param registry: Subcommands to add to the parser.
 
     :return: Parsed configuration.
     """
     # Initialize the global parser.
-    parser = argparse.ArgumentParser(
+    parser = CachedHelpParser(
         formatter_class=WideHelpFormatter,
         description="Example program. Description goes here.",
     )
@@ -110,21 +470,181 @@ def cli(args: Iterable[str] = None) -> Config:
         default="auto",
         help="print colors in log statements and output (never, always, auto; default:\u00A0%(default)s)",
     )
+    parser.add_argument(
+        "--completion",
+        action=CompletionAction,
+        command="boilerplatepython",
+        help="print shell completion script and exit (%(choices)s)",
+    )
+    parser.add_argument(
+        "--config",
+        metavar="FILE",
+        help="read settings from the [boilerplatepython] section of this INI file (default:\u00A0$BOILERPLATEPYTHON_CONFIG)",
+    )
     parser.add_argument("--force-wide", action="store_true", help="force wide logging output")
+    parser.add_argument(
+        "--install-completion",
+        action=CompletionAction,
+        command="boilerplatepython",
+        install=True,
+        help="install shell completion script if missing or outdated and exit (%(choices)s)",
+    )
+    parser.add_argument("--log-file", metavar="FILE", help="also append log statements to this file, fsynced in batches")
+    parser.add_argument(
+        "--log-file-batch",
+        metavar="N",
+        type=int,
+        help="with --log-file commit after this many statements (default:\u00A0100)",
+    )
+    parser.add_argument(
+        "--log-file-interval",
+        metavar="MS",
+        type=int,
+        help="with --log-file commit statements waiting this long (default:\u00A050)",
+    )
+    parser.add_argument(
+        "--log-file-wait",
+        action="store_true",
+        help="with --log-file wait for every statement to be committed (errors always are)",
+    )
+    parser.add_argument(
+        "--log-server",
+        metavar="ADDRESS",
+        help="also send log statements to this collector ([tcp://|udp://]host:port), in batches",
+    )
+    parser.add_argument(
+        "--log-server-wait",
+        metavar="MS",
+        type=int,
+        help="with --log-server wait this long for unsent statements at exit (default:\u00A01000)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=0,
+        help="number of parallel workers (default:\u00A0number of CPUs)",
+    )
+    parser.add_argument(
+        "--processes", action="store_true", help="run jobs in worker processes instead of threads (for CPU-bound work)"
+    )
+    parser.add_argument(
+        "--sample-key",
+        metavar="FIELD",
+        help="with --sample-rate keep or drop all log statements with the same value of this context field together",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        metavar="RATE",
+        type=float,
+        help="keep only this fraction (0 to 1) of DEBUG and INFO log statements (default:\u00A01)",
+    )
+    parser.add_argument(
+        "--shed-after",
+        metavar="MS",
+        type=int,
+        help="drop DEBUG then INFO output while writing to stdout takes longer than this (default:\u00A0never)",
+    )
+    parser.add_argument(
+        "--slow-span",
+        metavar="MS",
+        type=int,
+        help="with --timing log spans taking longer than this right away (default:\u00A0never)",
+    )
+    parser.add_argument("--timing", action="store_true", help="log timing span summaries at exit")
+    parser.add_argument(
+        "--timing-interval",
+        metavar="SECONDS",
+        type=int,
+        help="with --timing also log timing span summaries periodically (default:\u00A0only at exit)",
+    )
     verbosity_group.add_argument("-q", "--quiet", action="store_true", help="quiet output, only print errors")
     verbosity_group.add_argument(
         "-v", "--verbose", action="count", default=0, help="verbose mode, multiple -v increase the verbosity"
     )
     parser.add_argument("-V", "--version", action="version", version=__version__, help="print the program version and exit")
 
-    # Parse and return.
-    parsed = parser.parse_args(args if args is not None else sys.argv[1:])
-    return Config(
-        prog=parser.prog,
-        color=dict(never=False, always=True, auto=None)[parsed.color],
-        force_wide=parsed.force_wide,
-        quiet=parsed.quiet,
-        verbose=parsed.verbose,
+    # Add subcommands.
+    if registry is not None:
+        registry.add_parsers(parser)
+
+    # Parse. Defaults are None so only explicitly given arguments override lower configuration layers.
+    dests = [a.dest for a in parser._actions if a.dest != argparse.SUPPRESS]  # pylint: disable=protected-access
+    namespace = argparse.Namespace(**dict.fromkeys(dests))
+    parsed = parser.parse_args(args if args is not None else sys.argv[1:], namespace=namespace)
+    non_negative = (
+        ("-j/--jobs", parsed.jobs),
+        ("--log-file-batch", parsed.log_file_batch),
+        ("--log-file-interval", parsed.log_file_interval),
+        ("--log-server-wait", parsed.log_server_wait),
+        ("--shed-after", parsed.shed_after),
+        ("--slow-span", parsed.slow_span),
+        ("--timing-interval", parsed.timing_interval),
+    )
+    for option, value in non_negative:
+        if value is not None and value < 0:
+            parser.error(f"argument {option}: must not be negative")
+    if parsed.sample_rate is not None and not 0 <= parsed.sample_rate <= 1:
+        parser.error("argument --sample-rate: must be between 0 and 1")
+    explicit = {
+        "color": parsed.color,
+        "config_file": parsed.config,
+        "force_wide": parsed.force_wide,
+        "log_file": parsed.log_file,
+        "log_file_batch": parsed.log_file_batch,
+        "log_file_interval": parsed.log_file_interval,
+        "log_file_wait": parsed.log_file_wait,
+        "log_server": parsed.log_server,
+        "log_server_wait": parsed.log_server_wait,
+        "processes": parsed.processes,
+        "quiet": parsed.quiet,
+        "sample_key": parsed.sample_key,
+        "sample_rate": parsed.sample_rate,
+        "shed_after": parsed.shed_after,
+        "slow_span": parsed.slow_span,
+        "timing": parsed.timing,
+        "timing_interval": parsed.timing_interval,
+        "verbose": parsed.verbose,
+        "workers": parsed.jobs,
+    }
+    overrides = {k: v for k, v in explicit.items() if v is not None}
+    if "color" in overrides:
+        overrides["color"] = parse_color(overrides["color"])
+
+    # Load configuration layers and return.
+    try:
+        if "log_server" in overrides:
+            overrides["log_server"] = parse_log_server(overrides["log_server"])
+        command, command_args = getattr(parsed, "command", None), getattr(parsed, "command_args", None)
+        return load_config(dict(overrides, prog=parser.prog, command=command, command_args=command_args))
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+        raise  # For linters, parser.error() exits.
+
+
+def logging_kwargs(config: Config) -> Dict[str, Any]:
+    """Derive setup_logging() arguments from configuration.
+
+    :param config: Configuration.
+
+    :return: Keyword arguments.
+    """
+    return dict(
+        colors=config.color,
+        force_wide=config.force_wide,
+        log_file=config.log_file,
+        log_file_options=dict(
+            batch_size=max(config.log_file_batch, 1),
+            interval=config.log_file_interval / 1000,
+            wait=config.log_file_wait,
+        ),
+        log_server=config.log_server,
+        log_server_options=dict(flush_timeout=config.log_server_wait / 1000),
+        sample_key=config.sample_key,
+        sample_rate=config.sample_rate,
+        shed_slow_write=config.shed_after / 1000 if config.shed_after else None,
+        verbose=-1 if config.quiet else config.verbose,
     )
 
 
@@ -132,22 +652,49 @@ def main(args: Iterable[str] = None, register_exit: bool = True, setup_log: bool
     """CLI entry point.
 
     :param args: Pass these arguments to cli() instead of sys.argv[1:].
-    :param register_exit: Register signal handlers for graceful exiting.
+    :param register_exit: Register signal handlers for graceful exiting and configuration reloading.
     :param setup_log: Setup Python loggers.
     """
     exit_signaling = ExitSignaling()
     if register_exit:
         exit_signaling.register()  # Properly handle Control+C.
-    config = cli(args)
+    registry = SubcommandRegistry(SUBCOMMANDS).discover()
+    config = cli(args, registry)
+    log_kwargs = logging_kwargs(config)
     if setup_log:
-        setup_logging(
-            colors=config.color,
-            force_wide=config.force_wide,
-            verbose=-1 if config.quiet else config.verbose,
-        )
+        setup_logging(**log_kwargs)
+        exit_signaling.callbacks.append(flush_logging)  # Write and send batched records.
+        exit_signaling.callbacks.append(WARNINGS_ROUTER.flush)  # Log final warning counts, before the above.
+        exit_signaling.callbacks.append(SAMPLING_FILTER.flush)  # Log sampled out counts, also before flush_logging().
+    if register_exit:
+        reload_callbacks = [lambda c: setup_logging(**logging_kwargs(c))] if setup_log else []
+        reload_signaling = ReloadSignaling(config, reload_callbacks)
+        reload_signaling.register()  # Reload configuration on SIGHUP.
+        exit_signaling.callbacks.append(reload_signaling.unregister)  # Stop reloading before the above.
+    if config.timing:
+        SPANS.enabled = True
+        SPANS.slow_threshold = config.slow_span / 1000 if config.slow_span else None
+        if config.timing_interval:
+            SPANS.start_reporting(config.timing_interval)
+        exit_signaling.callbacks.append(SPANS.shutdown)
 
     # Run.
-    print("Hello World")
+    try:
+        with span("main"):
+            if config.command:
+                exit_signaling.exit_code = registry.invoke(config) or exit_signaling.exit_code
+            else:
+                runner = JobRunner(
+                    workers=config.workers,
+                    processes=config.processes,
+                    cancel_event=exit_signaling.stopping,
+                    log_kwargs=log_kwargs if setup_log else None,
+                )
+                with runner:
+                    for line in runner.map(str, ["Hello World"]):
+                        print(line)
+    finally:
+        exit_signaling.shutdown()
 
     # Exit.
     sys.exit(exit_signaling.exit_code)
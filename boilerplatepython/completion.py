@@ -0,0 +1,262 @@
+"""Static shell completion scripts generated from the argparse parser.
+
+Completion scripts are generated once and loaded by the shell, so pressing TAB never starts Python. The scripts are
+stamped with the program version, installed scripts are only regenerated when the version changes.
+"""
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from boilerplatepython import __version__
+
+REPEATABLE_ACTIONS = (argparse._AppendAction, argparse._CountAction)  # pylint: disable=protected-access
+SHELLS = ("bash", "fish", "zsh")
+
+
+class _Option(NamedTuple):
+    """Completion relevant properties of one optional argument."""
+
+    strings: List[str]
+    help: str
+    takes_value: bool
+    choices: Optional[List[str]]
+    repeatable: bool
+    excludes: List[str]
+
+
+def _header(command: str, shell: str) -> str:
+    """First line of every script, used to detect stale scripts."""
+    return f"# {command} {shell} completion, version {__version__}"
+
+
+def _options(parser: argparse.ArgumentParser) -> List[_Option]:
+    """Collect optional arguments from the parser."""
+    formatter = parser._get_formatter()  # pylint: disable=protected-access
+    exclusive: Dict[argparse.Action, List[str]] = {}
+    for group in parser._mutually_exclusive_groups:  # pylint: disable=protected-access
+        group_actions = group._group_actions  # pylint: disable=protected-access
+        for action in group_actions:
+            exclusive.setdefault(action, []).extend(s for a in group_actions if a is not action for s in a.option_strings)
+
+    options = []
+    for action in parser._actions:  # pylint: disable=protected-access
+        if not action.option_strings or action.help == argparse.SUPPRESS:
+            continue
+        help_text = formatter._expand_help(action) if action.help else ""  # pylint: disable=protected-access
+        options.append(
+            _Option(
+                strings=list(action.option_strings),
+                help=help_text.replace("\u00A0", " "),
+                takes_value=action.nargs != 0,
+                choices=[str(c) for c in action.choices] if action.choices else None,
+                repeatable=isinstance(action, REPEATABLE_ACTIONS),
+                excludes=exclusive.get(action, []),
+            )
+        )
+    return options
+
+
+def _subcommands(parser: argparse.ArgumentParser) -> Dict[str, str]:
+    """Collect subcommand names and help text from the parser."""
+    subcommands = {}
+    for action in parser._actions:  # pylint: disable=protected-access
+        if isinstance(action, argparse._SubParsersAction):  # pylint: disable=protected-access
+            help_texts = {a.dest: a.help or "" for a in action._choices_actions}  # pylint: disable=protected-access
+            subcommands.update((name, help_texts.get(name, "")) for name in action.choices)
+    return subcommands
+
+
+def _generate_bash(command: str, options: List[_Option], subcommands: Dict[str, str]) -> str:
+    """Generate a bash completion script."""
+    function = f"_{re.sub(r'[^A-Za-z0-9_]', '_', command)}_completion"
+    lines = [
+        _header(command, "bash"),
+        f"{function}() {{",
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}" word',
+        '    case "$prev" in',
+    ]
+    for option in options:
+        if option.takes_value:
+            compgen = f'-W "{" ".join(option.choices)}"' if option.choices else "-f"
+            lines.append(f'        {"|".join(option.strings)}) COMPREPLY=($(compgen {compgen} -- "$cur")); return;;')
+    lines += [
+        "    esac",
+        f'    local opts=" {" ".join([s for o in options for s in o.strings] + sorted(subcommands))} "',
+        '    for word in "${COMP_WORDS[@]:1:COMP_CWORD-1}"; do',
+        '        case "$word" in',
+    ]
+    if subcommands:
+        # Arguments after the subcommand belong to the subcommand.
+        lines.append(f'            {"|".join(sorted(subcommands))}) COMPREPLY=(); return;;')
+    for option in options:
+        removals = [f'opts="${{opts// {s} / }}"' for s in (option.excludes + ([] if option.repeatable else option.strings))]
+        if removals:
+            lines.append(f'            {"|".join(option.strings)}) {"; ".join(removals)};;')
+    lines += [
+        "        esac",
+        "    done",
+        '    COMPREPLY=($(compgen -W "$opts" -- "$cur"))',
+        "}",
+        f"complete -F {function} {command}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _generate_zsh(command: str, options: List[_Option], subcommands: Dict[str, str]) -> str:
+    """Generate a zsh completion script for the _arguments completion function."""
+    lines = [f"#compdef {command}", _header(command, "zsh"), "_arguments -s -S \\"]
+    for option in options:
+        excludes = option.excludes + ([] if option.repeatable else option.strings)
+        spec = f"'({' '.join(excludes)})" if excludes else "'"
+        spec += "*" if option.repeatable else ""
+        if len(option.strings) > 1:
+            spec += "'{" + ",".join(option.strings) + "}'"
+        else:
+            spec += option.strings[0]
+        spec += "[" + re.sub(r"([\[\]\\])", r"\\\1", option.help).replace("'", "'\\''") + "]"
+        if option.takes_value:
+            spec += ":value:" + (f"({' '.join(option.choices)})" if option.choices else "_files")
+        lines.append(f"  {spec}' \\")
+    if subcommands:
+        lines.append(f"  ':command:({' '.join(sorted(subcommands))})' \\")
+        lines.append("  '*::argument: ' \\")
+    lines[-1] = lines[-1][:-2]
+    return "\n".join(lines) + "\n"
+
+
+def _generate_fish(command: str, options: List[_Option], subcommands: Dict[str, str]) -> str:
+    """Generate a fish completion script."""
+
+    def flags(strings: List[str]) -> str:
+        """Convert option strings to fish complete arguments."""
+        converted = []
+        for string in strings:
+            if string.startswith("--"):
+                converted.append(f"-l {string[2:]}")
+            elif len(string) == 2:
+                converted.append(f"-s {string[1:]}")
+            else:
+                converted.append(f"-o {string[1:]}")
+        return " ".join(converted)
+
+    def quote(text: str) -> str:
+        """Quote for fish."""
+        return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    lines = [_header(command, "fish"), f"complete -c {command} -f"]
+    for option in options:
+        line = f"complete -c {command} {flags(option.strings)}"
+        excludes = option.excludes + ([] if option.repeatable else option.strings)
+        if excludes:
+            line += f" -n {quote('not __fish_seen_argument ' + flags(excludes))}"
+        if option.choices:
+            line += f" -x -a {quote(' '.join(option.choices))}"
+        elif option.takes_value:
+            line += " -r -F"
+        line += f" -d {quote(option.help)}"
+        lines.append(line)
+    for name in sorted(subcommands):
+        lines.append(f"complete -c {command} -n __fish_use_subcommand -a {quote(name)} -d {quote(subcommands[name])}")
+    return "\n".join(lines) + "\n"
+
+
+def completion_script(parser: argparse.ArgumentParser, shell: str, command: Optional[str] = None) -> str:
+    """Generate a shell completion script from a parser.
+
+    :param parser: Parser to read options from.
+    :param shell: One of SHELLS.
+    :param command: Command name to complete (default: parser.prog).
+
+    :return: The script.
+    """
+    generators = {"bash": _generate_bash, "fish": _generate_fish, "zsh": _generate_zsh}
+    return generators[shell](command or parser.prog, _options(parser), _subcommands(parser))
+
+
+def completion_path(shell: str, command: str) -> Path:
+    """Return where a shell looks for user installed completion scripts.
+
+    zsh has no such standard location, add the directory to $fpath.
+
+    :param shell: One of SHELLS.
+    :param command: Command name to complete.
+
+    :return: File path.
+    """
+    home = Path.home()
+    if shell == "bash":
+        data = Path(os.environ.get("XDG_DATA_HOME") or home / ".local" / "share")
+        return Path(os.environ.get("BASH_COMPLETION_USER_DIR") or data / "bash-completion") / "completions" / command
+    if shell == "fish":
+        return Path(os.environ.get("XDG_CONFIG_HOME") or home / ".config") / "fish" / "completions" / f"{command}.fish"
+    return home / ".zfunc" / f"_{command}"
+
+
+def is_stale(path: Path, shell: str, command: str) -> bool:
+    """Check if an installed completion script is missing or was generated by a different version.
+
+    :param path: Installed script.
+    :param shell: One of SHELLS.
+    :param command: Command name to complete.
+
+    :return: True if the script needs to be (re)generated.
+    """
+    try:
+        with path.open("r", encoding="utf8") as handle:
+            head = [handle.readline().rstrip("\n"), handle.readline().rstrip("\n")]
+    except OSError:
+        return True
+    return _header(command, shell) not in head
+
+
+def install_completion(parser: argparse.ArgumentParser, shell: str, command: str, path: Optional[Path] = None) -> bool:
+    """Write a completion script unless an up to date one is already installed.
+
+    :param parser: Parser to read options from.
+    :param shell: One of SHELLS.
+    :param command: Command name to complete.
+    :param path: Destination (default: completion_path()).
+
+    :return: True if the script was written.
+    """
+    path = path or completion_path(shell, command)
+    if not is_stale(path, shell, command):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(completion_script(parser, shell, command), encoding="utf8")
+    return True
+
+
+class CompletionAction(argparse.Action):
+    """Print (or install) a completion script and exit, like the built in version action."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, command: Optional[str] = None, install=False, **kwargs):
+        """Class constructor.
+
+        :param option_strings: Passed to argparse.Action.
+        :param dest: Passed to argparse.Action.
+        :param command: Command name to complete (default: parser.prog).
+        :param install: Install the script instead of printing it.
+        :param kwargs: Passed to argparse.Action.
+        """
+        kwargs.setdefault("choices", SHELLS)
+        kwargs.setdefault("metavar", "SHELL")
+        super().__init__(option_strings, dest=dest, default=argparse.SUPPRESS, **kwargs)
+        self.command = command
+        self.install = install
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """Generate the script and exit."""
+        command = self.command or parser.prog
+        if not self.install:
+            sys.stdout.write(completion_script(parser, values, command))
+            parser.exit()
+        path = completion_path(values, command)
+        try:
+            written = install_completion(parser, values, command, path)
+        except OSError as exc:
+            parser.exit(1, f"{parser.prog}: error: failed to write {path}: {exc}\n")
+        parser.exit(message=f"{'Installed' if written else 'Up to date'}: {path}\n")
@@ -1,16 +1,258 @@
-"""Configuration."""
-from typing import Optional
+"""Configuration.
+
+Settings are layered, later layers override earlier ones: defaults, config file, environment variables, CLI arguments.
+"""
+import configparser
+import os
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+CONFIG_FILE_SECTION = "boilerplatepython"
+ENV_PREFIX = "BOILERPLATEPYTHON_"
+FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+
+def parse_bool(value: str) -> bool:
+    """Parse a boolean setting from a config file or environment variable."""
+    try:
+        return {"1": True, "true": True, "yes": True, "on": True, "0": False, "false": False, "no": False, "off": False}[
+            value.strip().lower()
+        ]
+    except KeyError:
+        raise ValueError(f"not a boolean: {value}") from None
+
+
+def parse_color(value: str) -> Optional[bool]:
+    """Parse the color setting, same values as the --color CLI argument."""
+    try:
+        return {"never": False, "always": True, "auto": None}[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"not one of never, always, auto: {value}") from None
+
+
+def parse_count(value: str) -> int:
+    """Parse a non-negative integer setting."""
+    parsed = int(value)
+    if parsed < 0:
+        raise ValueError(f"must not be negative: {value}")
+    return parsed
+
+
+def parse_log_server(value: str) -> Tuple[str, str, int]:
+    """Parse a log collector address: [tcp://|udp://]host:port."""
+    protocol, _, address = value.strip().rpartition("://")
+    host, _, port = address.rpartition(":")
+    protocol = protocol.lower() or "tcp"
+    if protocol not in ("tcp", "udp") or not host or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"not [tcp://|udp://]host:port: {value}")
+    return protocol, host.strip("[]"), int(port)
+
+
+def parse_rate(value: str) -> float:
+    """Parse a fraction between 0 and 1."""
+    parsed = float(value)
+    if not 0 <= parsed <= 1:
+        raise ValueError(f"must be between 0 and 1: {value}")
+    return parsed
+
+
+# Settings read from config files and environment variables: name -> (default, parser).
+SETTINGS: Dict[str, Tuple[Any, Callable[[str], Any]]] = {
+    "color": (None, parse_color),
+    "force_wide": (False, parse_bool),
+    "log_file": (None, str),
+    "log_file_batch": (100, parse_count),
+    "log_file_interval": (50, parse_count),
+    "log_file_wait": (False, parse_bool),
+    "log_server": (None, parse_log_server),
+    "log_server_wait": (1000, parse_count),
+    "processes": (False, parse_bool),
+    "quiet": (False, parse_bool),
+    "sample_key": (None, str),
+    "sample_rate": (1.0, parse_rate),
+    "shed_after": (0, parse_count),
+    "slow_span": (0, parse_count),
+    "timing": (False, parse_bool),
+    "timing_interval": (0, parse_count),
+    "verbose": (0, parse_count),
+    "workers": (0, parse_count),
+}
+
+
+def read_config_file(path: str) -> Dict[str, str]:
+    """Read raw settings from a config file's [boilerplatepython] section.
+
+    Parsed files are cached until their modification time or size changes, so reloading an unchanged file is free.
+
+    :param path: INI file path.
+
+    :return: Setting names mapped to unparsed values.
+    """
+    stat = os.stat(path)
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    cached = FILE_CACHE.get(path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        with open(path, "r", encoding="utf8") as handle:
+            parser.read_file(handle)
+    except configparser.Error as exc:
+        raise ValueError(f"{path}: {exc}") from exc
+    values = dict(parser[CONFIG_FILE_SECTION]) if parser.has_section(CONFIG_FILE_SECTION) else {}
+    FILE_CACHE[path] = (cache_key, values)
+    return values
+
+
+def _parse_layer(source: str, raw: Mapping[str, str]) -> Dict[str, Any]:
+    """Parse raw setting values from one layer."""
+    parsed = {}
+    for name, value in raw.items():
+        if name not in SETTINGS:
+            raise ValueError(f"{source}: unknown setting: {name}")
+        try:
+            parsed[name] = SETTINGS[name][1](value)
+        except ValueError as exc:
+            raise ValueError(f"{source}: invalid {name}: {exc}") from exc
+    return parsed
 
 
-# pylint: disable=too-few-public-methods
 class Config:
-    """Main configuration state."""
+    """Main configuration state, an immutable snapshot."""
+
+    __slots__ = (
+        "prog",
+        "color",
+        "command",
+        "command_args",
+        "config_file",
+        "force_wide",
+        "log_file",
+        "log_file_batch",
+        "log_file_interval",
+        "log_file_wait",
+        "log_server",
+        "log_server_wait",
+        "quiet",
+        "sample_key",
+        "sample_rate",
+        "shed_after",
+        "verbose",
+        "slow_span",
+        "timing",
+        "timing_interval",
+        "processes",
+        "workers",
+        "_overrides",
+    )
+
+    prog: Optional[str]
+
+    color: Optional[bool]
+    force_wide: Optional[bool]
+    log_file: Optional[str]
+    log_file_batch: Optional[int]
+    log_file_interval: Optional[int]
+    log_file_wait: Optional[bool]
+    log_server: Optional[Tuple[str, str, int]]
+    log_server_wait: Optional[int]
+    quiet: Optional[bool]
+    sample_key: Optional[str]
+    sample_rate: Optional[float]
+    shed_after: Optional[int]
+    verbose: Optional[int]
+
+    slow_span: Optional[int]
+    timing: Optional[bool]
+    timing_interval: Optional[int]
+
+    command: Optional[str]
+    command_args: Tuple[str, ...]
+    config_file: Optional[str]
+
+    processes: Optional[bool]
+    workers: Optional[int]
+
+    _overrides: Optional[Dict[str, Any]]  # Explicitly given values, kept for reload().
 
     def __init__(self, **kwargs):
         """Class constructor."""
-        self.prog: Optional[str] = kwargs.get("prog", None)
+        for name in self.__slots__:
+            object.__setattr__(self, name, kwargs.pop(name, None))
+        object.__setattr__(self, "command_args", tuple(self.command_args or ()))
+        if kwargs:
+            raise TypeError(f"Unknown configuration fields: {', '.join(sorted(kwargs))}")
+
+    def __setattr__(self, name: str, value: Any):
+        """Prevent changes, use replace() instead."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        """Prevent changes."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare all fields."""
+        if not isinstance(other, Config):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __hash__(self) -> int:
+        """Hash all fields."""
+        return hash(tuple(self.as_dict().items()))
+
+    def __repr__(self) -> str:
+        """Represent fields."""
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return public fields as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+
+    def replace(self, **changes) -> "Config":
+        """Return a copy with some fields changed."""
+        return Config(**{**self.as_dict(), "_overrides": self._overrides, **changes})
+
+    def reload(self, environ: Optional[Mapping[str, str]] = None) -> "Config":
+        """Load a new snapshot from the same config file and CLI arguments, with a fresh look at the environment.
+
+        :param environ: Environment variables (default: os.environ).
+
+        :return: New configuration.
+        """
+        return load_config(self._overrides or {}, environ)
+
+
+def load_config(overrides: Optional[Mapping[str, Any]] = None, environ: Optional[Mapping[str, str]] = None) -> Config:
+    """Layer defaults, config file, environment variables, and overrides (CLI arguments) into a Config.
+
+    The config file is the config_file override, otherwise the BOILERPLATEPYTHON_CONFIG environment variable.
+
+    :param overrides: Explicitly given values, may include fields not in SETTINGS such as prog.
+    :param environ: Environment variables (default: os.environ).
+
+    :raises OSError: Unable to read the config file.
+    :raises ValueError: Invalid or unknown setting.
+
+    :return: Configuration snapshot.
+    """
+    overrides = dict(overrides or {})
+    environ = os.environ if environ is None else environ
+    values: Dict[str, Any] = {name: default for name, (default, _) in SETTINGS.items()}
+
+    config_file = overrides.get("config_file") or environ.get(f"{ENV_PREFIX}CONFIG") or None
+    if config_file:
+        values.update(_parse_layer(config_file, read_config_file(config_file)))
+
+    environ_names = {f"{ENV_PREFIX}{name.upper()}": name for name in SETTINGS}
+    values.update(_parse_layer("environment", {n: environ[k] for k, n in environ_names.items() if k in environ}))
+
+    # Quiet and verbose are mutually exclusive, the one given explicitly wins over lower layers.
+    if overrides.get("verbose"):
+        values["quiet"] = False
+    if overrides.get("quiet"):
+        values["verbose"] = 0
 
-        self.color: Optional[bool] = kwargs.get("color", None)
-        self.force_wide: Optional[bool] = kwargs.get("force_wide", None)
-        self.quiet: Optional[bool] = kwargs.get("quiet", None)
-        self.verbose: Optional[int] = kwargs.get("verbose", None)
+    values.update(overrides)
+    values["config_file"] = config_file
+    return Config(_overrides=overrides, **values)
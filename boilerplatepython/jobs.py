@@ -0,0 +1,182 @@
+"""Parallel job execution."""
+import logging
+import os
+import signal
+import sys
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Executor, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set
+
+from boilerplatepython.logging import flush_logging, LOG_CONTEXT, LogContext, setup_logging
+
+_WORKER_CANCEL_EVENT: Any = None  # multiprocessing.Event shared with the parent, set in worker processes.
+
+
+def _init_process_worker(log_kwargs: Optional[Dict[str, Any]], cancel_event: Any):
+    """Prepare a worker process.
+
+    The parent process handles signals and cancels the workers, so workers ignore Control+C. Logging is set up the same
+    way as in the parent, replacing any handlers inherited through fork(). Workers exit without atexit handlers, so
+    batched records (e.g. log_file, log_server) are flushed by a multiprocessing finalizer instead.
+
+    :param log_kwargs: Passed to setup_logging() if not None.
+    :param cancel_event: multiprocessing.Event set by the parent to cancel jobs.
+    """
+    global _WORKER_CANCEL_EVENT  # pylint: disable=global-statement
+    _WORKER_CANCEL_EVENT = cancel_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if log_kwargs is not None:
+        from multiprocessing.util import Finalize  # pylint: disable=import-outside-toplevel
+
+        logging.getLogger().handlers.clear()
+        setup_logging(**log_kwargs)
+        Finalize(None, flush_logging, args=(log_kwargs.get("logger_name"),), exitpriority=10)
+
+
+def _run_chunk(
+    func: Callable[[Any], Any],
+    chunk: List[Any],
+    cancel_event: Optional[threading.Event],
+    log_ctx: LogContext,
+) -> List[Any]:
+    """Run func on every item in a chunk, checking for cancellation in between items.
+
+    :param func: Function to call.
+    :param chunk: Items to pass to the function one at a time.
+    :param cancel_event: Stop early when set, None in worker processes to use the event shared by the parent.
+    :param log_ctx: Logging context of the submitter, replacing any context inherited by forked worker processes.
+
+    :return: Results in the same order as the chunk.
+    """
+    if cancel_event is None:
+        cancel_event = _WORKER_CANCEL_EVENT
+    results = []
+    token = LOG_CONTEXT.set(log_ctx)
+    try:
+        for item in chunk:
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+            results.append(func(item))
+    finally:
+        LOG_CONTEXT.reset(token)
+    return results
+
+
+class JobRunner:
+    """Run a function over many items using a pool of worker threads or processes.
+
+    * Items are submitted in chunks to amortize scheduling overhead.
+    * Only a bounded number of chunks are in flight so huge or infinite inputs don't pile up in memory.
+    * Results are streamed either in input order or as soon as they're ready.
+    * Cancellation (e.g. from ExitSignaling) stops submitting new chunks and workers stop between items.
+    * Workers log with the same log_context() fields as the caller of map().
+
+    Use processes for CPU-bound work, threads are limited by the GIL. multiprocessing is only imported when used.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        processes: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        log_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        """Class constructor.
+
+        :param workers: Number of workers (0 for the number of CPUs).
+        :param processes: Use worker processes instead of threads.
+        :param cancel_event: Cancel jobs when this is set.
+        :param log_kwargs: setup_logging() arguments to apply in worker processes.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.log_kwargs = log_kwargs
+        self._executor: Optional[Executor] = None
+        self._process_cancel_event: Any = None
+
+    def __enter__(self) -> "JobRunner":
+        """Start the worker pool."""
+        if self.processes:
+            import multiprocessing  # pylint: disable=import-outside-toplevel
+            from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+            self._process_cancel_event = multiprocessing.Event()
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                initializer=_init_process_worker,
+                initargs=(self.log_kwargs, self._process_cancel_event),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="JobRunner")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stop the worker pool, cancelling outstanding work if leaving because of an exception."""
+        if exc_type is not None:
+            self.cancel()
+        if exc_type is not None and sys.version_info >= (3, 9):
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def cancel(self):
+        """Cancel running jobs."""
+        self.cancel_event.set()
+        if self._process_cancel_event is not None:
+            self._process_cancel_event.set()
+
+    def _submit(self, func: Callable[[Any], Any], chunk: List[Any]) -> Future:
+        """Submit one chunk to the pool."""
+        cancel_event = None if self.processes else self.cancel_event
+        return self._executor.submit(_run_chunk, func, chunk, cancel_event, LOG_CONTEXT.get())
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Any], chunksize: int = 1, ordered: bool = True) -> Iterator:
+        """Call func on every item in parallel and yield the results.
+
+        :param func: Function to call, must be picklable when using processes.
+        :param items: Items to pass to the function one at a time.
+        :param chunksize: Number of items each worker handles per task.
+        :param ordered: Yield results in the same order as items, otherwise in order of completion.
+
+        :return: Generator of results.
+        """
+        if self._executor is None:
+            raise RuntimeError("JobRunner must be used as a context manager")
+        iterator = iter(items)
+        chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+        max_in_flight = self.workers * 2
+        pending: Deque[Future] = deque()
+        not_done: Set[Future] = set()
+
+        try:
+            while True:
+                # Top up the pipeline.
+                while len(pending) + len(not_done) < max_in_flight and not self.cancel_event.is_set():
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    if ordered:
+                        pending.append(self._submit(func, chunk))
+                    else:
+                        not_done.add(self._submit(func, chunk))
+                if self.cancel_event.is_set():
+                    self.cancel()  # Also tell worker processes.
+                    raise CancelledError()
+                if not pending and not not_done:
+                    return
+
+                # Stream results.
+                if ordered:
+                    yield from pending.popleft().result()
+                    continue
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in (*pending, *not_done):
+                future.cancel()
@@ -0,0 +1,226 @@
+"""Low overhead timing spans.
+
+Durations are aggregated in memory per span name (count, total, min, max, and a log2 histogram) instead of being logged
+one by one. Summaries are logged periodically and at exit, only unusually slow spans are logged right away.
+"""
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+HISTOGRAM_BUCKETS = 32  # Bucket i counts durations below 2**i microseconds, the last one also counts anything slower.
+
+
+class SpanStats:
+    """Aggregated durations of one span name."""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self):
+        """Class constructor."""
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+        self.buckets: List[int] = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration: float):
+        """Add one duration.
+
+        :param duration: Seconds.
+        """
+        self.count += 1
+        self.total += duration
+        self.minimum = min(self.minimum, duration)
+        self.maximum = max(self.maximum, duration)
+        self.buckets[min(int(duration * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile from the histogram, rounded up to the bucket's upper bound and capped at the maximum.
+
+        :param fraction: Percentile between 0 and 1 (e.g. 0.99).
+
+        :return: Seconds.
+        """
+        needed = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= needed:
+                return min((2 ** index) / 1e6, self.maximum)
+        return self.maximum
+
+
+class SpanRegistry:
+    """Collect span durations from any thread or asyncio task and report them through logging.
+
+    :ivar enabled: Record spans, when False spans skip timing entirely.
+    :ivar slow_threshold: Log spans taking at least this many seconds immediately (None to disable).
+    """
+
+    def __init__(self, enabled: bool = True, slow_threshold: Optional[float] = None, logger_name: str = __name__):
+        """Class constructor.
+
+        :param enabled: Record spans.
+        :param slow_threshold: Log spans taking at least this many seconds immediately.
+        :param logger_name: Log summaries and slow spans to this logger.
+        """
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.log = logging.getLogger(logger_name)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, SpanStats] = {}
+        self._reporter: Optional[threading.Thread] = None
+        self._stop_reporter = threading.Event()
+
+    def record(self, name: str, duration: float):
+        """Add one span duration.
+
+        :param name: Span name.
+        :param duration: Seconds.
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats()
+            stats.add(duration)
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            self.log.warning("Slow span %s: %.6f s", name, duration)
+
+    def collect(self) -> Dict[str, SpanStats]:
+        """Take the aggregated stats, starting a new aggregation period.
+
+        :return: Span names mapped to their stats.
+        """
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def report(self):
+        """Log one summary line per span name aggregated since the last report."""
+        for name, stats in sorted(self.collect().items()):
+            self.log.info(
+                "Span %s: count=%d total=%.6fs mean=%.6fs min=%.6fs p50<=%.6fs p99<=%.6fs max=%.6fs",
+                name,
+                stats.count,
+                stats.total,
+                stats.total / stats.count,
+                stats.minimum,
+                stats.percentile(0.5),
+                stats.percentile(0.99),
+                stats.maximum,
+            )
+
+    def start_reporting(self, interval: float):
+        """Report from a background thread every interval.
+
+        :param interval: Seconds.
+        """
+        if self._reporter is not None:
+            return
+        self._stop_reporter.clear()
+
+        def run():
+            while not self._stop_reporter.wait(interval):
+                self.report()
+
+        self._reporter = threading.Thread(target=run, name="SpanReporter", daemon=True)
+        self._reporter.start()
+
+    def shutdown(self):
+        """Stop the reporter thread and report whatever was aggregated since the last report."""
+        if self._reporter is not None:
+            self._stop_reporter.set()
+            self._reporter.join()
+            self._reporter = None
+        self.report()
+
+    def span(self, name: str) -> "Span":
+        """Time a code section, see Span.
+
+        :param name: Span name.
+
+        :return: Context manager and decorator.
+        """
+        return Span(name, self)
+
+
+class Span:
+    """Time a code section, as a context manager or as a decorator of functions and coroutine functions.
+
+    As a context manager use a new Span for each block, as a decorator one Span is shared by all calls.
+    """
+
+    __slots__ = ("name", "registry", "_start")
+
+    def __init__(self, name: str, registry: SpanRegistry):
+        """Class constructor.
+
+        :param name: Span name.
+        :param registry: Record durations here.
+        """
+        self.name = name
+        self.registry = registry
+        self._start: Optional[float] = None
+
+    def __enter__(self) -> "Span":
+        """Start timing."""
+        self._start = time.perf_counter() if self.registry.enabled else None
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stop timing, also when leaving because of an exception."""
+        if self._start is not None:
+            self.registry.record(self.name, time.perf_counter() - self._start)
+
+    def __call__(self, func: Callable) -> Callable:
+        """Decorate a function."""
+        registry, name = self.registry, self.name
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                if not registry.enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    registry.record(name, time.perf_counter() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.record(name, time.perf_counter() - start)
+
+        return wrapper
+
+
+SPANS = SpanRegistry(enabled=False)  # Default registry, enabled by the --timing CLI argument.
+
+
+def span(name: str) -> Span:
+    """Time a code section with the default registry.
+
+    with span("db.query"):
+        ...
+
+    @span("render")
+    def render():
+        ...
+
+    :param name: Span name.
+
+    :return: Context manager and decorator.
+    """
+    return Span(name, SPANS)
@@ -0,0 +1,62 @@
+"""Benchmarks."""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from boilerplatepython.logging import DurableFileHandler
+
+RECORDS_PER_THREAD = 200
+POLICIES: Dict[str, Dict[str, Any]] = {
+    "wait, commit asap": dict(wait=True, interval=0),
+    "wait, 5ms interval": dict(wait=True, interval=0.005),
+    "no wait, 100 records or 50ms": dict(batch_size=100, interval=0.05),
+    "no wait, no fsync": dict(batch_size=100, interval=0.05, fsync=False),
+}
+
+
+@pytest.mark.parametrize("threads", [1, 8])
+@pytest.mark.parametrize("policy", list(POLICIES))
+def test_durable_file_handler(tmp_path: Path, policy: str, threads: int):
+    """Print records per second and per record latency of logging calls.
+
+    :param tmp_path: pytest fixture.
+    :param policy: Handler arguments to measure.
+    :param threads: Number of threads logging concurrently.
+    """
+    handler = DurableFileHandler(str(tmp_path / "log.txt"), **POLICIES[policy])
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    log = logging.getLogger(f"{__name__}.{policy}.{threads}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    latencies: List[float] = []
+
+    def emit():
+        thread_latencies = []
+        for i in range(RECORDS_PER_THREAD):
+            start = time.perf_counter()
+            log.info("Audit record %d", i)
+            thread_latencies.append(time.perf_counter() - start)
+        latencies.extend(thread_latencies)
+
+    workers = [threading.Thread(target=emit) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    handler.close()  # Includes committing what's left.
+    elapsed = time.perf_counter() - start
+    log.removeHandler(handler)
+
+    latencies.sort()
+    print(
+        f"\n{policy}, {threads} thread(s): {len(latencies) / elapsed:,.0f} records/s, "
+        f"latency p50 {latencies[len(latencies) // 2] * 1e6:,.0f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:,.0f} us"
+    )
+    assert len((tmp_path / "log.txt").read_text().splitlines()) == len(latencies)
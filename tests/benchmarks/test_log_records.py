@@ -0,0 +1,61 @@
+"""Benchmarks."""
+import gc
+import logging
+import time
+import tracemalloc
+from typing import Callable, List
+
+import pytest
+
+from boilerplatepython.logging import compact_record_factory, LOG_FORMAT_DEFAULT, LogFormatter
+
+RECORDS = 50_000
+RECORD_ARGS = ("boilerplatepython.bench", logging.INFO, __file__, 42, "Processed %d items in %s", (1234, "batch"), None)
+FACTORIES = {
+    "stdlib LogRecord": logging.LogRecord,
+    "CompactLogRecord": compact_record_factory(["asctime", "levelname", "funcName", "lineno", "context", "message"]),
+}
+
+
+def _bytes_per_record(factory: Callable) -> float:
+    """Measure memory held by records kept in a list (e.g. a queue or buffer), after formatting them."""
+    formatter = LogFormatter(LOG_FORMAT_DEFAULT)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records: List = []
+    for _ in range(RECORDS):
+        record = factory(*RECORD_ARGS)
+        formatter.format(record)
+        records.append(record)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / RECORDS
+
+
+def _records_per_second(factory: Callable) -> float:
+    """Measure creating and formatting records."""
+    formatter = LogFormatter(LOG_FORMAT_DEFAULT)
+    start = time.perf_counter()
+    for _ in range(RECORDS):
+        formatter.format(factory(*RECORD_ARGS))
+    return RECORDS / (time.perf_counter() - start)
+
+
+@pytest.mark.parametrize("name", list(FACTORIES))
+def test_log_records(name: str):
+    """Print memory per record and records per second, relative to stdlib records measured alternately.
+
+    :param name: Record factory to measure.
+    """
+    factory = FACTORIES[name]
+    memory = _bytes_per_record(factory)
+    rate = baseline = 0.0
+    for _ in range(5):  # Alternate to share slow periods of a noisy machine.
+        rate = max(rate, _records_per_second(factory))
+        baseline = max(baseline, _records_per_second(logging.LogRecord))
+    print(f"\n{name}: {memory:.0f} bytes/record, {rate:,.0f} records/s created and formatted", end="")
+    print(f" ({rate / baseline:.2f}x stdlib)")
+
+    if name != "stdlib LogRecord":
+        assert memory < _bytes_per_record(logging.LogRecord)
@@ -0,0 +1,52 @@
+"""Benchmarks."""
+import io
+import logging
+import time
+from typing import Optional
+
+import pytest
+
+from boilerplatepython.logging import log_context, LOG_FORMAT_DEFAULT, LogFormatter, SamplingFilter
+
+RECORDS = 50_000
+SAMPLERS = {
+    "no sampling": None,
+    "rate 0.01, evenly spaced": SamplingFilter(rate=0.01),
+    "rate 0.01, by request": SamplingFilter(rate=0.01, key="request"),
+}
+
+
+def _seconds_per_record(name: str, sampling_filter: Optional[SamplingFilter]) -> float:
+    """Measure DEBUG log calls through a formatting handler writing to memory."""
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(LogFormatter(LOG_FORMAT_DEFAULT))
+    log = logging.getLogger(f"{__name__}.{name}")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.handlers = [handler]
+    if sampling_filter is not None:
+        sampling_filter.install()
+    try:
+        start = time.perf_counter()
+        for request_id in range(RECORDS // 10):
+            with log_context(request=request_id):
+                for i in range(10):
+                    log.debug("Processed %d items in %s", i, "batch")
+        return (time.perf_counter() - start) / RECORDS
+    finally:
+        if sampling_filter is not None:
+            sampling_filter.uninstall()
+
+
+@pytest.mark.parametrize("name", list(SAMPLERS))
+def test_sampling_filter(name: str):
+    """Print the cost per DEBUG statement with and without sampling (10 statements per request).
+
+    :param name: Sampler to measure.
+    """
+    seconds = min(_seconds_per_record(name, SAMPLERS[name]) for _ in range(3))
+    baseline = min(_seconds_per_record(f"{name}.baseline", None) for _ in range(3))
+    print(f"\n{name}: {seconds * 1e6:.2f} us/record ({seconds / baseline:.0%} of no sampling)")
+
+    if SAMPLERS[name] is not None:
+        assert seconds < baseline / 4  # Sampled out statements cost a small fraction, records are never created.
@@ -0,0 +1,108 @@
+"""Tests."""
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython import __version__
+from boilerplatepython.__main__ import cli
+from boilerplatepython.completion import completion_path, is_stale
+
+
+def _generate(capsys: CaptureFixture, shell: str) -> str:
+    """Run the CLI to generate a script."""
+    with pytest.raises(SystemExit) as exc:
+        cli(args=["--completion", shell])
+    assert exc.value.code in (None, 0)
+    return capsys.readouterr()[0]
+
+
+@pytest.mark.parametrize("shell", ["bash", "fish", "zsh"])
+def test_options(capsys: CaptureFixture, shell: str):
+    """Test that options, choices, and help text end up in the script.
+
+    :param capsys: pytest fixture.
+    :param shell: Shell to generate for.
+    """
+    script = _generate(capsys, shell)
+
+    assert f"# boilerplatepython {shell} completion, version {__version__}" in script.splitlines()[:2]
+    assert "never always auto" in script
+    for option in ("color", "force-wide", "jobs", "quiet", "verbose", "version"):
+        assert option in script
+    if shell != "bash":
+        assert "force wide logging output" in script
+        assert "\u00A0" not in script
+
+
+def test_bash(capsys: CaptureFixture):
+    """Test the bash script by running the completion function.
+
+    :param capsys: pytest fixture.
+    """
+    bash = shutil.which("bash")
+    if not bash:
+        pytest.skip("bash not available")
+    script = _generate(capsys, "bash")
+
+    def complete(*words: str) -> list:
+        shell_words = " ".join(f"'{w}'" for w in ("boilerplatepython",) + words)
+        test = f"COMP_WORDS=({shell_words}); COMP_CWORD={len(words)}; _boilerplatepython_completion"
+        test += '; echo "${COMPREPLY[*]}"'
+        return subprocess.check_output([bash, "-c", f"{script}\n{test}"]).decode("utf8").split()
+
+    assert complete("--co") == ["--color", "--completion", "--config"]
+    assert complete("--color", "a") == ["always", "auto"]
+    assert complete("--config", __file__[:-3]) == [__file__]
+
+    # Mutually exclusive group.
+    assert "--verbose" in complete("")
+    assert "--verbose" not in complete("-q", "")
+    assert "--quiet" not in complete("-v", "")
+    assert "--verbose" in complete("-v", "")  # Count action can be repeated.
+    assert "--force-wide" not in complete("--force-wide", "")
+
+
+def test_install(capsys: CaptureFixture, monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Test installing only rewrites the script when the version changes.
+
+    :param capsys: pytest fixture.
+    :param monkeypatch: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    path = completion_path("fish", "boilerplatepython")
+    assert path == tmp_path / "fish" / "completions" / "boilerplatepython.fish"
+    assert is_stale(path, "fish", "boilerplatepython")
+
+    for expected in ("Installed", "Up to date"):
+        with pytest.raises(SystemExit):
+            cli(args=["--install-completion", "fish"])
+        assert capsys.readouterr()[1] == f"{expected}: {path}\n"
+    assert not is_stale(path, "fish", "boilerplatepython")
+
+    # Simulate upgrade.
+    monkeypatch.setattr("boilerplatepython.completion.__version__", "99.0.0")
+    assert is_stale(path, "fish", "boilerplatepython")
+    with pytest.raises(SystemExit):
+        cli(args=["--install-completion", "fish"])
+    assert capsys.readouterr()[1].startswith("Installed: ")
+    assert "version 99.0.0" in path.read_text()
+
+
+def test_install_read_only(capsys: CaptureFixture, monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Test error handling when the destination can't be written.
+
+    :param capsys: pytest fixture.
+    :param monkeypatch: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    (tmp_path / "fish").write_text("not a directory")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    with pytest.raises(SystemExit) as exc:
+        cli(args=["--install-completion", "fish"])
+    assert exc.value.code == 1
+    assert "error: failed to write" in capsys.readouterr()[1]
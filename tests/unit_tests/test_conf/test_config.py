@@ -0,0 +1,111 @@
+"""Tests."""
+import os
+from pathlib import Path
+
+import pytest
+
+from boilerplatepython import conf
+from boilerplatepython.conf import Config, load_config, SETTINGS
+
+
+def test_layers(tmp_path: Path):
+    """Test precedence: defaults, config file, environment variables, overrides.
+
+    :param tmp_path: pytest fixture.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\ncolor = always\nforce_wide = yes\nworkers = 2\nverbose = 1\n")
+    environ = {"BOILERPLATEPYTHON_CONFIG": str(config_file), "BOILERPLATEPYTHON_WORKERS": "3"}
+
+    assert load_config(environ={}) == Config(**{name: default for name, (default, _) in SETTINGS.items()})
+
+    config = load_config({"workers": 4, "prog": "test"}, environ=environ)
+    assert config.color is True  # From file.
+    assert config.force_wide is True  # From file.
+    assert config.verbose == 1  # From file.
+    assert config.workers == 4  # From overrides.
+    assert config.prog == "test"
+    assert config.config_file == str(config_file)
+
+    assert load_config(environ=environ).workers == 3  # From environment.
+    assert load_config({"quiet": True}, environ=environ).verbose == 0  # Explicit quiet wins over verbose from file.
+
+
+def test_immutable():
+    """Test that snapshots can't be changed in place."""
+    config = Config(verbose=1, command_args=["a"])
+    with pytest.raises(AttributeError):
+        config.verbose = 2
+    with pytest.raises(AttributeError):
+        config.other = 2  # pylint: disable=assigning-non-slot
+    with pytest.raises(TypeError):
+        Config(other=2)
+
+    assert config.command_args == ("a",)
+    changed = config.replace(verbose=2)
+    assert (config.verbose, changed.verbose) == (1, 2)
+    assert changed == Config(verbose=2, command_args=("a",))
+    assert hash(changed) == hash(Config(verbose=2, command_args=("a",)))
+
+
+def test_file_cache(tmp_path: Path):
+    """Test that unchanged config files are only parsed once.
+
+    :param tmp_path: pytest fixture.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\nverbose = 1\n")
+    overrides = {"config_file": str(config_file)}
+
+    first = conf.read_config_file(str(config_file))
+    assert conf.read_config_file(str(config_file)) is first
+
+    config_file.write_text("[boilerplatepython]\nverbose = 2\n")
+    os.utime(config_file, ns=(1, 1))
+    assert conf.read_config_file(str(config_file)) is not first
+    config = load_config(overrides, environ={})
+    assert config.verbose == 2
+
+    config_file.write_text("[boilerplatepython]\nverbose = 3\n")
+    assert config.reload(environ={}).verbose == 3
+    assert config.verbose == 2
+
+
+@pytest.mark.parametrize(
+    "contents,environ,message",
+    [
+        ("[boilerplatepython]\nunknown = 1\n", {}, "unknown setting: unknown"),
+        ("[boilerplatepython]\ncolor = sometimes\n", {}, "invalid color: not one of never, always, auto: sometimes"),
+        ("[boilerplatepython]\nforce_wide = maybe\n", {}, "invalid force_wide: not a boolean: maybe"),
+        ("[boilerplatepython]\nworkers = -1\n", {}, "invalid workers: must not be negative: -1"),
+        ("[boilerplatepython]\nlog_server = http://host:80\n", {}, "invalid log_server: not [tcp://|udp://]host:port"),
+        ("", {"BOILERPLATEPYTHON_LOG_SERVER": "host"}, "environment: invalid log_server"),
+        ("[boilerplatepython]\nsample_rate = 2\n", {}, "invalid sample_rate: must be between 0 and 1: 2"),
+        ("", {"BOILERPLATEPYTHON_SAMPLE_RATE": "half"}, "environment: invalid sample_rate"),
+        ("not an ini file\n", {}, "File contains no section headers"),
+        ("", {"BOILERPLATEPYTHON_VERBOSE": "lots"}, "environment: invalid verbose"),
+    ],
+)
+def test_invalid(tmp_path: Path, contents: str, environ: dict, message: str):
+    """Test error handling.
+
+    :param tmp_path: pytest fixture.
+    :param contents: Config file contents.
+    :param environ: Environment variables.
+    :param message: Expected error message substring.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(contents)
+
+    with pytest.raises(ValueError) as exc:
+        load_config({"config_file": str(config_file)}, environ=environ)
+    assert message in str(exc.value)
+
+
+def test_missing_file(tmp_path: Path):
+    """Test error handling.
+
+    :param tmp_path: pytest fixture.
+    """
+    with pytest.raises(OSError):
+        load_config(environ={"BOILERPLATEPYTHON_CONFIG": str(tmp_path / "missing.ini")})
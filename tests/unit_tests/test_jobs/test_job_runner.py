@@ -0,0 +1,162 @@
+"""Tests."""
+import logging
+import threading
+import time
+from concurrent.futures import CancelledError
+from pathlib import Path
+
+import pytest
+
+from boilerplatepython.jobs import JobRunner
+from boilerplatepython.logging import LOG_CONTEXT, log_context
+
+
+def square(value: int) -> int:
+    """Square a number, at module level so worker processes can unpickle it."""
+    return value * value
+
+
+def jittery_square(value: int) -> int:
+    """Finish later items first to shuffle completion order."""
+    time.sleep((10 - value) / 1000)
+    return value * value
+
+
+@pytest.mark.parametrize("processes", [False, True])
+@pytest.mark.parametrize("chunksize", [1, 3, 100])
+def test_ordered(processes: bool, chunksize: int):
+    """Test results come back in input order.
+
+    :param processes: Use worker processes.
+    :param chunksize: Items per task.
+    """
+    with JobRunner(workers=2, processes=processes) as runner:
+        actual = list(runner.map(square, range(10), chunksize=chunksize))
+    assert actual == [i * i for i in range(10)]
+
+
+def test_unordered():
+    """Test results are streamed as they complete."""
+    with JobRunner(workers=4) as runner:
+        actual = list(runner.map(jittery_square, range(10), ordered=False))
+    assert sorted(actual) == [i * i for i in range(10)]
+
+
+def test_lazy_input():
+    """Test that only a bounded number of items are pulled from the input ahead of the results."""
+    pulled = []
+
+    def items():
+        for i in range(1000):
+            pulled.append(i)
+            yield i
+
+    with JobRunner(workers=2) as runner:
+        results = runner.map(square, items(), chunksize=5)
+        assert next(results) == 0
+        assert len(pulled) <= 2 * 2 * 5 + 1
+        assert sum(1 for _ in results) == 999
+
+
+def test_cancel():
+    """Test cooperative cancellation stops workers between items and stops submitting new chunks."""
+    cancel_event = threading.Event()
+    processed = []
+
+    def work(value: int) -> int:
+        processed.append(value)
+        if value == 3:
+            cancel_event.set()
+        return value
+
+    with JobRunner(workers=1, cancel_event=cancel_event) as runner:
+        with pytest.raises(CancelledError):
+            list(runner.map(work, range(1000), chunksize=10))
+
+    assert processed == [0, 1, 2, 3]
+
+
+def slow_identity(value: int) -> int:
+    """Take a while per item."""
+    time.sleep(0.05)
+    return value
+
+
+def test_cancel_processes():
+    """Test that worker processes stop between items instead of finishing their chunk."""
+    with JobRunner(workers=1, processes=True) as runner:
+        assert list(runner.map(square, range(2))) == [0, 1]  # Start the worker.
+        timer = threading.Timer(0.2, runner.cancel)
+        start = time.monotonic()
+        timer.start()
+        with pytest.raises(CancelledError):
+            list(runner.map(slow_identity, range(100), chunksize=100))  # About 5 seconds uncancelled.
+    timer.join()
+    assert time.monotonic() - start < 1.5
+
+
+def test_exception_cancels():
+    """Test that an exception raised in the with block (e.g. SystemExit from a signal) cancels outstanding jobs."""
+    runner = JobRunner(workers=1)
+    with pytest.raises(SystemExit):
+        with runner:
+            for _ in runner.map(square, range(1000)):
+                raise SystemExit(130)
+    assert runner.cancel_event.is_set()
+
+
+def test_not_started():
+    """Test misuse."""
+    with pytest.raises(RuntimeError):
+        next(JobRunner().map(square, range(3)))
+
+
+def test_thread_logging(caplog: pytest.LogCaptureFixture):
+    """Test that worker threads log through the same handlers as the main thread.
+
+    :param caplog: pytest fixture.
+    """
+
+    def work(value: int) -> int:
+        logging.getLogger(__name__).info("Working on %d", value)
+        return value
+
+    with JobRunner(workers=2) as runner:
+        list(runner.map(work, range(3)))
+    assert sorted(r.getMessage() for r in caplog.records) == ["Working on 0", "Working on 1", "Working on 2"]
+
+
+def log_item(value: int) -> int:
+    """Log from a worker."""
+    logging.getLogger(__name__).info("Worker item %d", value)
+    return value
+
+
+def test_process_log_file(tmp_path: Path):
+    """Test that records batched by worker processes are written before the workers exit.
+
+    :param tmp_path: pytest fixture.
+    """
+    log_file = tmp_path / "log.txt"
+    with JobRunner(workers=2, processes=True, log_kwargs=dict(log_file=str(log_file))) as runner:
+        assert list(runner.map(log_item, range(4))) == [0, 1, 2, 3]
+    assert sorted(line.split(": ")[-1] for line in log_file.read_text().splitlines()) == [
+        f"Worker item {i}" for i in range(4)
+    ]
+
+
+def context_fields(_) -> tuple:
+    """Return the logging context fields seen by the worker."""
+    return LOG_CONTEXT.get().fields
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_log_context(processes: bool):
+    """Test that workers inherit the caller's logging context fields.
+
+    :param processes: Use worker processes.
+    """
+    with JobRunner(workers=2, processes=processes) as runner:
+        with log_context(job="abc"):
+            assert list(runner.map(context_fields, range(3))) == [(("job", "abc"),)] * 3
+        assert list(runner.map(context_fields, range(3))) == [()] * 3
@@ -1,6 +1,7 @@
 """pytest fixtures and hooks."""
 import os
 import time
+from typing import List
 
 import pytest
 from _pytest.fixtures import FixtureRequest
@@ -34,3 +35,15 @@ def freeze_time(monkeypatch: MonkeyPatch) -> float:
     mock_seconds = 1576790285.41593
     monkeypatch.setattr("time.time", lambda: mock_seconds)
     return mock_seconds
+
+
+@pytest.fixture()
+def fsyncs(monkeypatch: MonkeyPatch) -> List[int]:
+    """Count os.fsync() calls. Return the file descriptors passed to it, one per call.
+
+    :param monkeypatch: pytest fixture.
+    """
+    calls: List[int] = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (calls.append(fd), fsync(fd))[1])
+    return calls
@@ -0,0 +1,118 @@
+"""Tests."""
+import logging
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.logging import CaptureHandler, setup_logging
+from .utils import generate_log_statements
+
+
+def _init_logger(name: str, handler: CaptureHandler) -> logging.Logger:
+    """Create a logger for tests."""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger
+
+
+def test_capacity(logger_name: str):
+    """Test that the ring buffer and its indexes never grow past capacity.
+
+    :param logger_name: conftest fixture.
+    """
+    handler = CaptureHandler(capacity=5)
+    log = _init_logger(logger_name, handler)
+    for i in range(23):
+        logging.getLogger(f"{logger_name}.child{i % 3}").log(logging.INFO if i % 2 else logging.ERROR, "Message %d", i)
+    log.warning("Last.")
+
+    assert len(handler) == 5
+    assert [r.message for r in handler.query()] == ["Message 19", "Message 20", "Message 21", "Message 22", "Last."]
+    # pylint: disable=protected-access
+    assert sum(len(i) for i in handler._by_level.values()) == 5
+    assert sum(len(i) for i in handler._by_name.values()) == 5
+    assert sorted(handler._by_name) == [logger_name] + [f"{logger_name}.child{i}" for i in range(3)]
+
+    handler.clear()
+    assert not handler.query()
+    assert len(handler) == 0
+
+
+def test_max_message_length(logger_name: str):
+    """Test that huge messages are truncated, keeping memory use capped.
+
+    :param logger_name: conftest fixture.
+    """
+    handler = CaptureHandler(capacity=2, max_message_length=10)
+    log = _init_logger(logger_name, handler)
+    log.info("%s", "x" * 1_000_000)
+    log.info("Short.")
+    assert [r.message for r in handler.query()] == ["x" * 10, "Short."]
+    assert CaptureHandler().max_message_length == 4096
+
+
+def test_query(monkeypatch: MonkeyPatch, logger_name: str):
+    """Test filtering by level, logger name, time range, and limit.
+
+    :param monkeypatch: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    handler = CaptureHandler(capacity=100)
+    _init_logger(logger_name, handler)
+    db = logging.getLogger(f"{logger_name}.db")
+    web = logging.getLogger(f"{logger_name}.web")
+    for second in range(60):
+        monkeypatch.setattr("time.time", lambda s=second: 1000.0 + s)
+        db.info("db info %d", second)
+        (db if second % 10 else web).error("error %d", second)
+
+    assert len(handler.query(level=logging.ERROR)) == 50  # Capacity limit.
+    assert len(handler.query(logger=f"{logger_name}.web")) == 5
+    assert len(handler.query(logger=logger_name)) == 100  # Includes children.
+    assert not handler.query(logger=f"{logger_name}.d")  # Not a prefix match.
+
+    # Errors from db in the last 30 seconds.
+    actual = handler.query(level=logging.ERROR, logger=f"{logger_name}.db", since=1030.0)
+    assert [r.message for r in actual] == [f"error {i}" for i in range(30, 60) if i % 10]
+    assert all(r.levelno == logging.ERROR and r.name == f"{logger_name}.db" for r in actual)
+
+    actual = handler.query(since=1050.0, until=1052.0)
+    assert [r.message for r in actual] == ["db info 50", "error 50", "db info 51", "error 51"]
+
+    actual = handler.query(level=logging.ERROR, limit=3)
+    assert [r.message for r in actual] == ["error 57", "error 58", "error 59"]
+
+
+def test_invalid_capacity():
+    """Test validation."""
+    with pytest.raises(ValueError):
+        CaptureHandler(capacity=0)
+    with pytest.raises(ValueError):
+        CaptureHandler(max_message_length=0)
+
+
+@pytest.mark.usefixtures("freeze_time")
+def test_setup_logging(capsys: CaptureFixture, request: FixtureRequest, logger_name: str):
+    """Test attaching the handler through setup_logging next to the console handlers.
+
+    :param capsys: pytest fixture.
+    :param request: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    request.addfinalizer(lambda: logging.disable(logging.NOTSET))
+    handler = CaptureHandler()
+    log = setup_logging(logger_name=logger_name, verbose=1, handlers=[handler])
+    generate_log_statements(log, emit_warnings=False)
+
+    assert handler in log.handlers
+    assert capsys.readouterr()[0]
+    assert [r.message for r in handler.query(level=logging.ERROR)] == [
+        "An error has occurred.",
+        "Critical failure: ERR",
+        "Here be an exception.",
+    ]
+    assert handler.query()[0].created == 1576790285.41593
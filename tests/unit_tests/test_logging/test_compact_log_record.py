@@ -0,0 +1,123 @@
+"""Tests."""
+import copy
+import logging
+import pickle
+import sys
+import threading
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.fixtures import FixtureRequest
+
+from boilerplatepython.logging import compact_record_factory, CompactLogRecord, LogFormatter, setup_logging
+from .utils import generate_log_statements
+
+
+@pytest.fixture(autouse=True)
+def _reset(request: FixtureRequest):
+    """Reset global state after each test run.
+
+    :param request: pytest fixture.
+    """
+    request.addfinalizer(lambda: logging.setLogRecordFactory(logging.LogRecord))
+    request.addfinalizer(lambda: logging.disable(logging.NOTSET))
+
+
+@pytest.mark.parametrize("force_wide", [False, True])
+@pytest.mark.usefixtures("freeze_time")
+def test_same_output(capsys: CaptureFixture, logger_name: str, force_wide: bool):
+    """Test that compact records are formatted the same as regular ones.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    :param force_wide: Use the wide format.
+    """
+    log = setup_logging(logger_name=logger_name, verbose=3, force_wide=force_wide)
+    generate_log_statements(log, emit_warnings=False)
+    expected = capsys.readouterr()
+
+    setup_logging(logger_name=logger_name, verbose=3, force_wide=force_wide, compact_records=True)
+    assert logging.getLogRecordFactory().func is CompactLogRecord
+    generate_log_statements(log, emit_warnings=False)
+    assert capsys.readouterr() == expected
+
+    setup_logging(logger_name=logger_name, verbose=3, force_wide=force_wide)
+    assert logging.getLogRecordFactory() is logging.LogRecord
+
+
+def test_fields():
+    """Test that expensive fields are only looked up when needed."""
+    args = ("name", logging.INFO, "/path/to/file.py", 12, "Message %s", ("arg",), None, "func")
+    regular = logging.LogRecord(*args)
+    full = CompactLogRecord(*args)
+    for name in CompactLogRecord.FIELDS:
+        if name not in ("created", "msecs", "relativeCreated", "taskName"):
+            assert getattr(full, name) == getattr(regular, name, None), name
+    assert full.getMessage() == "Message arg"
+
+    partial = compact_record_factory(["asctime", "levelname", "message"])(*args)
+    assert (partial.filename, partial.module, partial.threadName, partial.process) == (None, None, None, None)
+    partial = compact_record_factory(["threadName"])(*args)
+    assert partial.threadName == threading.current_thread().name
+
+
+def test_extra(logger_name: str):
+    """Test extra fields added by Logger.makeRecord().
+
+    :param logger_name: conftest fixture.
+    """
+    logging.setLogRecordFactory(compact_record_factory())
+    log = logging.getLogger(logger_name)
+    record = log.makeRecord(logger_name, logging.INFO, "file.py", 1, "Message", (), None, extra={"request": "abc"})
+    assert isinstance(record, CompactLogRecord)
+    assert record.request == "abc"
+    assert record.__dict__["request"] == "abc"
+    assert not hasattr(record, "unknown")
+    assert len(record.__dict__) == len(CompactLogRecord.FIELDS) + 1
+    with pytest.raises(KeyError):
+        log.makeRecord(logger_name, logging.INFO, "file.py", 1, "Message", (), None, extra={"levelno": 1})
+    record.request = "def"
+    record.user = "x"
+    record.lineno = 2
+    assert (record.request, record.user, record.lineno) == ("def", "x", 2)
+    assert (record.__dict__["user"], record.__dict__["lineno"]) == ("x", 2)
+    record.request = "abc"
+    del record.__dict__["user"]
+
+    # Copy, serialize (like SocketHandler), and format.
+    copied = copy.copy(record)
+    assert (copied.msg, copied.request) == ("Message", "abc")
+    rebuilt = logging.makeLogRecord(pickle.loads(pickle.dumps(dict(record.__dict__))))
+    assert (rebuilt.getMessage(), rebuilt.request) == ("Message", "abc")
+    assert LogFormatter("%(request)s %(levelname)s %(message)s").format(record) == "abc INFO Message"
+
+
+def test_filter_fields(capsys: CaptureFixture, request: FixtureRequest, logger_name: str):
+    """Test the stdlib idiom of filters adding fields as attributes, with the factory installed by setup_logging().
+
+    :param capsys: pytest fixture.
+    :param request: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    request.addfinalizer(lambda: setup_logging(logger_name=logger_name))
+
+    def add_request_id(record: logging.LogRecord) -> bool:
+        record.request_id = "abc"
+        return True
+
+    log = setup_logging(logger_name=logger_name, compact_records=True)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.addFilter(add_request_id)
+    handler.setFormatter(logging.Formatter("%(request_id)s %(message)s"))
+    log.addHandler(handler)
+    request.addfinalizer(lambda: log.removeHandler(handler))
+    log.info("Message")
+    assert capsys.readouterr()[0].splitlines()[-1] == "abc Message"
+
+
+def test_formatter_attributes():
+    """Test that formatting doesn't attach custom fields to records."""
+    record = logging.LogRecord("name", logging.INFO, "file.py", 1, "Message", (), None)
+    fields_before = set(record.__dict__)
+    LogFormatter(force_wide=True, colors=True).format(record)
+    assert set(record.__dict__) - fields_before == {"message", "asctime"}
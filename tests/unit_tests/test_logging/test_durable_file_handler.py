@@ -0,0 +1,222 @@
+"""Tests."""
+import inspect
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.logging import DurableFileHandler, HANDLER_NAME_FILE, setup_logging
+
+
+def _init_logger(name: str, handler: DurableFileHandler, request: FixtureRequest) -> logging.Logger:
+    """Create a logger for tests."""
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    request.addfinalizer(handler.close)
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [handler]
+    return logger
+
+
+def _eventually(condition: Callable[[], bool]) -> bool:
+    """Poll a condition for up to a few seconds."""
+    for _ in range(300):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_batch_size(fsyncs: List[int], logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test committing once the batch is full.
+
+    :param fsyncs: conftest fixture.
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    log = _init_logger(logger_name, DurableFileHandler(str(path), batch_size=3, interval=60), request)
+    log.info("one")
+    log.info("two")
+    time.sleep(0.05)
+    assert path.read_text() == ""
+
+    log.info("three")
+    assert _eventually(lambda: path.read_text() == "INFO one\nINFO two\nINFO three\n")
+    assert len(fsyncs) == 1
+
+
+def test_interval(logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test committing once the oldest record waited long enough.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    log = _init_logger(logger_name, DurableFileHandler(str(path), batch_size=1000, interval=0.01), request)
+    log.info("one")
+    assert _eventually(lambda: path.read_text() == "INFO one\n")
+
+
+def test_wait_and_force(logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test waiting for records to be durable, and errors forcing a commit.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    handler = DurableFileHandler(str(path), batch_size=1000, interval=60)
+    log = _init_logger(logger_name, handler, request)
+    log.info("buffered")
+    log.error("forced")
+    assert path.read_text() == "INFO buffered\nERROR forced\n"  # Already durable when error() returns.
+
+    handler.wait = True
+    handler.interval = 0
+    log.info("waited")
+    assert path.read_text().endswith("INFO waited\n")
+
+    handler.wait = False
+    handler.interval = 60
+    log.info("flushed")
+    handler.flush()
+    assert path.read_text().endswith("INFO flushed\n")
+
+    log.info("closed")
+    handler.close()
+    assert path.read_text().endswith("INFO flushed\nINFO closed\n")
+
+
+def test_durable_extra(logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test choosing per record whether to wait, overriding the handler's wait setting.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    handler = DurableFileHandler(str(path), batch_size=1000, interval=60, wait=True)
+    log = _init_logger(logger_name, handler, request)
+    log.info("not waited", extra={"durable": False})
+    assert path.read_text() == ""
+
+    handler.wait = False
+    handler.interval = 0.01
+    log.info("waited", extra={"durable": True})
+    assert path.read_text() == "INFO not waited\nINFO waited\n"
+
+
+def test_flush_during_commit(monkeypatch: MonkeyPatch, logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test that flushing while a batch is being written doesn't stop the committer.
+
+    :param monkeypatch: pytest fixture.
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    writing = threading.Event()
+    fsync = os.fsync
+
+    def slow_fsync(fd: int):
+        writing.set()
+        time.sleep(0.3)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    path = tmp_path / "log.txt"
+    handler = DurableFileHandler(str(path), interval=0)
+    log = _init_logger(logger_name, handler, request)
+    log.info("one")
+    assert writing.wait(5)
+    handler.flush()
+    assert handler._committer.is_alive()  # pylint: disable=protected-access
+
+    log.error("two")  # Forced commit, would block forever without a committer.
+    assert path.read_text() == "INFO one\nERROR two\n"
+
+
+def test_group_commit(fsyncs: List[int], logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test that concurrent waiting emitters share fsyncs.
+
+    :param fsyncs: conftest fixture.
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    log = _init_logger(logger_name, DurableFileHandler(str(path), interval=0.005, wait=True), request)
+
+    def emit(thread: int):
+        for i in range(50):
+            log.info("thread %d record %d", thread, i)
+
+    threads = [threading.Thread(target=emit, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = path.read_text().splitlines()
+    assert sorted(lines) == sorted(f"INFO thread {t} record {i}" for t in range(8) for i in range(50))
+    assert len(fsyncs) < len(lines)
+
+
+def test_no_fsync(fsyncs: List[int], logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test only handing batches to the OS.
+
+    :param fsyncs: conftest fixture.
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    log = _init_logger(logger_name, DurableFileHandler(str(path), fsync=False, wait=True, interval=0), request)
+    log.info("one")
+    assert path.read_text() == "INFO one\n"
+    assert not fsyncs
+
+
+def test_invalid_batch_size(tmp_path: Path):
+    """Test validation.
+
+    :param tmp_path: pytest fixture.
+    """
+    with pytest.raises(ValueError):
+        DurableFileHandler(str(tmp_path / "log.txt"), batch_size=0)
+
+
+@pytest.mark.usefixtures("freeze_time")
+def test_setup_logging(logger_name: str, request: FixtureRequest, tmp_path: Path):
+    """Test adding, reconfiguring, and removing the handler through setup_logging.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    path = tmp_path / "log.txt"
+    log = setup_logging(logger_name=logger_name, colors=True, log_file=str(path), log_file_options=dict(wait=True))
+    handler = next(h for h in log.handlers if h.get_name() == HANDLER_NAME_FILE)
+    request.addfinalizer(handler.close)
+    lineno = inspect.currentframe().f_lineno + 1
+    log.warning("Wide without colors.")
+    assert path.read_text() == f"2019-12-19T21:18:05.415 [WARNING ] test_setup_logging:{lineno}: Wide without colors.\n"
+
+    # Same file, options changed in place.
+    setup_logging(logger_name=logger_name, log_file=str(path), log_file_options=dict(wait=False, batch_size=5))
+    assert [h for h in log.handlers if h.get_name() == HANDLER_NAME_FILE] == [handler]
+    assert (handler.wait, handler.batch_size) == (False, 5)
+
+    # Removed.
+    setup_logging(logger_name=logger_name)
+    assert handler not in log.handlers
+    assert handler.stream.closed
@@ -0,0 +1,110 @@
+"""Tests."""
+import asyncio
+import logging
+import sys
+import threading
+from typing import List
+
+from _pytest.capture import CaptureFixture
+
+from boilerplatepython.logging import LOG_CONTEXT, log_context, LogFormatter
+
+
+def _init_logger(name: str) -> logging.Logger:
+    """Create a logger for tests writing to stdout."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(LogFormatter("%(context)s%(message)s", colors=False))
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [handler]
+    return logger
+
+
+def test_nesting(capsys: CaptureFixture, logger_name: str):
+    """Test merging nested fields and restoring the outer context on exit.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    log = _init_logger(logger_name)
+    log.info("none")
+    with log_context(request="abc") as outer:
+        assert outer.prefix == "request=abc "
+        log.info("outer")
+        with log_context(job=7, request="def"):
+            log.info("inner")
+        log.info("outer again")
+    log.info("none again")
+
+    assert LOG_CONTEXT.get().fields == ()
+    assert capsys.readouterr()[0].splitlines() == [
+        "none",
+        "request=abc outer",
+        "request=def job=7 inner",
+        "request=abc outer again",
+        "none again",
+    ]
+
+
+def test_formatter():
+    """Test that the formatter uses the bound context's prefix without attaching it to records."""
+    formatter = LogFormatter("%(context)s%(message)s", colors=False)
+    with log_context(request="abc"):
+        record = logging.LogRecord("name", logging.INFO, __file__, 1, "message %d", (1,), None)
+        assert formatter.format(record) == "request=abc message 1"
+    assert not hasattr(record, "context")
+
+    record = logging.makeLogRecord({"msg": "message", "context": "explicit "})
+    assert formatter.format(record) == "explicit message"
+
+
+def test_threads(capsys: CaptureFixture, logger_name: str):
+    """Test that threads don't see each other's fields.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    log = _init_logger(logger_name)
+    barrier = threading.Barrier(2)
+
+    def worker(name: str):
+        with log_context(thread=name):
+            barrier.wait()
+            log.info("message")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(capsys.readouterr()[0].splitlines()) == ["thread=a message", "thread=b message"]
+
+
+def test_asyncio(capsys: CaptureFixture, logger_name: str):
+    """Test that interleaved asyncio tasks keep their own fields.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    log = _init_logger(logger_name)
+    order: List[str] = []
+
+    async def task(name: str):
+        with log_context(task=name):
+            for i in range(2):
+                order.append(name)
+                log.info("step %d", i)
+                await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(task("a"), task("b"))
+
+    asyncio.run(run())
+    assert order == ["a", "b", "a", "b"]
+    assert capsys.readouterr()[0].splitlines() == [
+        "task=a step 0",
+        "task=b step 0",
+        "task=a step 1",
+        "task=b step 1",
+    ]
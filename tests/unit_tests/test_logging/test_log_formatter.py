@@ -102,3 +102,25 @@ def test_colors(capsys: CaptureFixture, logger_name: str):
 
     assert "19T21:18:05.415 \033[91mERRO\033[0m: An error has occurred." in output
     assert "Traceback \033[1;36m(most recent call last)\033[0m:" in output
+
+
+@pytest.mark.parametrize(
+    "fmt,style",
+    [
+        ("%(shortlevelname)s %(context)s%(request)s %(message)s", "%"),
+        ("{shortlevelname} {context}{request} {message}", "{"),
+        ("$shortlevelname ${context}$request $message", "$"),
+    ],
+)
+def test_styles(fmt: str, style: str):
+    """Test custom fields together with record fields and extra fields in all format styles.
+
+    :param fmt: Format string.
+    :param style: Format style.
+    """
+    formatter = LogFormatter(fmt, style=style)
+    record = logging.makeLogRecord(dict(msg="Message", levelno=logging.INFO, request="abc"))
+    assert formatter.format(record) == "INFO abc Message"
+
+    record = logging.makeLogRecord(dict(msg="Message", levelno=logging.INFO, request="abc", context="ctx "))
+    assert formatter.format(record) == "INFO ctx abc Message"
@@ -0,0 +1,302 @@
+"""Tests."""
+import inspect
+import logging
+import socket
+import struct
+import threading
+import time
+from typing import Callable, List
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.logging import flush_logging, HANDLER_NAME_NETWORK, NetworkHandler, setup_logging
+
+
+class Collector:  # pylint: disable=too-many-instance-attributes
+    """Local stand-in for a log collector, decoding length-prefixed records."""
+
+    def __init__(self, protocol: str = "tcp", port: int = 0, host: str = "127.0.0.1"):
+        """Class constructor."""
+        self.protocol = protocol
+        self.records: List[str] = []
+        self.connections = 0
+        self.receives = 0
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM if protocol == "tcp" else socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        self.stopping = False
+        self.client: socket.socket = None
+        if protocol == "tcp":
+            self.sock.listen()
+        self.thread = threading.Thread(target=self._serve_tcp if protocol == "tcp" else self._serve_udp, daemon=True)
+        self.thread.start()
+
+    def _decode(self, data: bytes) -> bytes:
+        """Decode complete records, return leftover bytes."""
+        while len(data) >= 4:
+            size = struct.unpack(">I", data[:4])[0]
+            if len(data) < 4 + size:
+                break
+            self.records.append(data[4 : 4 + size].decode("utf8"))  # noqa: E203
+            data = data[4 + size :]  # noqa: E203
+        return data
+
+    def _serve_tcp(self):
+        """Accept connections one at a time."""
+        self.sock.settimeout(0.01)
+        while not self.stopping:
+            try:
+                self.client, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.client.settimeout(0.01)
+            self.connections += 1
+            data = b""
+            while not self.stopping:
+                try:
+                    chunk = self.client.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                self.receives += 1
+                data = self._decode(data + chunk)
+            self.client.close()
+
+    def _serve_udp(self):
+        """Receive datagrams."""
+        self.sock.settimeout(0.01)
+        while not self.stopping:
+            try:
+                datagram = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.receives += 1
+            self._decode(datagram)
+
+    def disconnect(self):
+        """Close the current client connection."""
+        self.client.shutdown(socket.SHUT_RDWR)
+
+    def stop(self):
+        """Stop serving."""
+        self.stopping = True
+        self.thread.join()
+        self.sock.close()
+
+
+def _eventually(condition: Callable[[], bool]) -> bool:
+    """Poll a condition for up to a few seconds."""
+    for _ in range(300):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _init_logger(name: str, handler: NetworkHandler, request: FixtureRequest) -> logging.Logger:
+    """Create a logger for tests."""
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    request.addfinalizer(handler.close)
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [handler]
+    return logger
+
+
+@pytest.mark.parametrize("protocol", ["tcp", "udp"])
+def test_batching(logger_name: str, request: FixtureRequest, protocol: str):
+    """Test sending batches of framed records over one connection.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    :param protocol: Transport.
+    """
+    collector = Collector(protocol)
+    request.addfinalizer(collector.stop)
+    handler = NetworkHandler("127.0.0.1", collector.port, protocol, batch_size=10, interval=60)
+    log = _init_logger(logger_name, handler, request)
+    for i in range(25):
+        log.info("record %d\nsecond line", i)
+    assert _eventually(lambda: len(collector.records) == 20)
+    assert collector.records == [f"INFO record {i}\nsecond line" for i in range(20)]
+
+    handler.flush()
+    assert _eventually(lambda: len(collector.records) == 25)
+    assert collector.receives <= 3 if protocol == "udp" else collector.connections == 1
+
+
+@pytest.mark.skipif(not socket.has_ipv6, reason="No IPv6 support.")
+def test_udp_ipv6(logger_name: str, request: FixtureRequest):
+    """Test sending datagrams to an IPv6 collector.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    try:
+        collector = Collector("udp", host="::1")
+    except OSError:
+        pytest.skip("No IPv6 loopback.")
+    request.addfinalizer(collector.stop)
+    log = _init_logger(logger_name, NetworkHandler("::1", collector.port, "udp", interval=0), request)
+    log.info("over IPv6")
+    assert _eventually(lambda: collector.records == ["INFO over IPv6"])
+
+
+def test_udp_datagram_size(logger_name: str, request: FixtureRequest):
+    """Test splitting batches into datagrams.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    collector = Collector("udp")
+    request.addfinalizer(collector.stop)
+    handler = NetworkHandler("127.0.0.1", collector.port, "udp", batch_size=10, interval=60)
+    log = _init_logger(logger_name, handler, request)
+    for i in range(10):
+        log.info("%d %s", i, "x" * 2000)
+    assert _eventually(lambda: len(collector.records) == 10)
+    assert collector.receives == 3  # Four records per 8 KiB datagram.
+
+
+def test_udp_truncate(logger_name: str, request: FixtureRequest):
+    """Test truncating records too large for a datagram instead of retrying them forever.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    collector = Collector("udp")
+    request.addfinalizer(collector.stop)
+    handler = NetworkHandler("127.0.0.1", collector.port, "udp", interval=0)
+    log = _init_logger(logger_name, handler, request)
+    log.info("%s", "\u00e9" * 40_000)
+    log.info("small")
+    assert _eventually(lambda: len(collector.records) == 2)
+    assert collector.records[0] == "INFO " + "\u00e9" * ((NetworkHandler.MAX_DATAGRAM - 4 - 5) // 2)
+    assert collector.records[1] == "INFO small"
+
+
+def test_reconnect_and_spill(logger_name: str, request: FixtureRequest):
+    """Test spilling while the collector is down, dropping the oldest records, and reconnecting.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    collector = Collector()
+    port = collector.port
+    collector.stop()
+
+    handler = NetworkHandler("127.0.0.1", port, batch_size=1, interval=0, spill_capacity=5, backoff=0.01, max_backoff=0.05)
+    log = _init_logger(logger_name, handler, request)
+    for i in range(10):
+        log.info("spilled %d", i)
+    assert _eventually(lambda: handler.dropped == 5)
+
+    collector = Collector(port=port)
+    request.addfinalizer(collector.stop)
+    assert _eventually(lambda: len(collector.records) == 6)
+    assert collector.records == [f"INFO spilled {i}" for i in range(5, 10)] + [
+        "WARNING Dropped 5 records while the collector was unreachable"
+    ]
+
+    # Collector drops the connection.
+    collector.disconnect()
+    time.sleep(0.05)
+    log.info("after disconnect")
+    assert _eventually(lambda: collector.records[-1:] == ["INFO after disconnect"])
+    assert collector.connections == 2
+
+
+def test_flush_unreachable(logger_name: str, request: FixtureRequest):
+    """Test that flushing and closing give up right away while the collector is unreachable.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    collector = Collector()
+    collector.stop()
+    handler = NetworkHandler("127.0.0.1", collector.port)
+    log = _init_logger(logger_name, handler, request)
+    log.info("lost")
+    assert _eventually(lambda: handler._stalled)  # pylint: disable=protected-access
+
+    # Like exiting: flush_logging(), logging.shutdown(), then close().
+    start = time.monotonic()
+    handler.flush()
+    handler.flush()
+    handler.close()
+    assert time.monotonic() - start < 0.5
+    assert handler.dropped == 1
+
+
+def test_flush_timeout(monkeypatch: MonkeyPatch, logger_name: str, request: FixtureRequest):
+    """Test that flushing waits at most flush_timeout for a slow collector, and only once.
+
+    :param monkeypatch: pytest fixture.
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    handler = NetworkHandler("127.0.0.1", 1, flush_timeout=0.2)
+
+    def slow_connect():
+        time.sleep(1)
+        raise ConnectionRefusedError()
+
+    monkeypatch.setattr(handler, "_connect", slow_connect)
+    log = _init_logger(logger_name, handler, request)
+    log.info("lost")
+
+    start = time.monotonic()
+    handler.flush()
+    assert 0.2 <= time.monotonic() - start < 0.5
+    handler.flush()
+    handler.close()
+    assert time.monotonic() - start < 0.7
+
+
+def test_invalid():
+    """Test validation."""
+    with pytest.raises(ValueError):
+        NetworkHandler("127.0.0.1", 1, "http")
+    with pytest.raises(ValueError):
+        NetworkHandler("127.0.0.1", 1, spill_capacity=0)
+
+
+def test_setup_logging(logger_name: str, request: FixtureRequest):
+    """Test adding the handler through setup_logging and flushing it on shutdown.
+
+    :param logger_name: conftest fixture.
+    :param request: pytest fixture.
+    """
+    collector = Collector()
+    request.addfinalizer(collector.stop)
+    log = setup_logging(
+        logger_name=logger_name,
+        colors=True,
+        log_server=("tcp", "127.0.0.1", collector.port),
+        log_server_options=dict(interval=60),
+    )
+    handler = next(h for h in log.handlers if h.get_name() == HANDLER_NAME_NETWORK)
+    request.addfinalizer(handler.close)
+    log.warning("Wide without colors.")
+    line = inspect.currentframe().f_lineno - 1
+    time.sleep(0.05)
+    assert not collector.records
+
+    flush_logging(logger_name)
+    assert _eventually(lambda: len(collector.records) == 1)
+    assert collector.records[0].endswith(f"[WARNING ] test_setup_logging:{line}: Wide without colors.")
+
+    setup_logging(logger_name=logger_name)
+    assert handler not in log.handlers
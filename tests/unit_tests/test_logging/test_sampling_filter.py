@@ -0,0 +1,209 @@
+"""Tests."""
+import inspect
+import logging
+from typing import List
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.fixtures import FixtureRequest
+
+from boilerplatepython.logging import CaptureHandler, log_context, SAMPLING_FILTER, SamplingFilter, setup_logging
+from boilerplatepython.logging import WARNINGS_ROUTER
+
+
+def _init_logger(name: str, sampling_filter: SamplingFilter, handlers: int = 1) -> List[CaptureHandler]:
+    """Create a logger for tests with capturing handlers sharing one filter."""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    captures = []
+    for _ in range(handlers):
+        handler = CaptureHandler()
+        handler.addFilter(sampling_filter)
+        logger.addHandler(handler)
+        captures.append(handler)
+    return captures
+
+
+def test_evenly_spaced(logger_name: str):
+    """Test keeping evenly spaced DEBUG and INFO records without a key, and always keeping warnings.
+
+    :param logger_name: conftest fixture.
+    """
+    sampling_filter = SamplingFilter(rate=0.25)
+    handler = _init_logger(logger_name, sampling_filter)[0]
+    log = logging.getLogger(logger_name)
+    for i in range(20):
+        log.log(logging.DEBUG if i % 2 else logging.INFO, "Message %d", i)
+        log.warning("Warning %d", i)
+
+    messages = [r.message for r in handler.query()]
+    assert [m for m in messages if m.startswith("Message")] == [f"Message {i}" for i in (3, 7, 11, 15, 19)]
+    assert len([m for m in messages if m.startswith("Warning")]) == 20
+    assert sampling_filter.sampled_out == {logging.DEBUG: 5, logging.INFO: 10}
+
+
+def test_key(logger_name: str):
+    """Test keeping or dropping all records of the same context value together, deterministically.
+
+    :param logger_name: conftest fixture.
+    """
+    sampling_filter = SamplingFilter(rate=0.5, key="request")
+    handler = _init_logger(logger_name, sampling_filter)[0]
+    log = logging.getLogger(logger_name)
+    for request_id in range(200):
+        with log_context(request=request_id, user="x"):
+            for step in range(3):
+                log.info("Request %d step %d", request_id, step)
+
+    kept = [r.message for r in handler.query()]
+    kept_ids = sorted({int(m.split()[1]) for m in kept})
+    assert 70 < len(kept_ids) < 130
+    assert len(kept) == len(kept_ids) * 3  # Whole requests.
+    assert sum(sampling_filter.sampled_out.values()) == 600 - len(kept)
+
+    # Same decisions with a new filter (e.g. another process).
+    other = SamplingFilter(rate=0.5, key="request")
+    with log_context(request=kept_ids[0]):
+        assert other.filter(logging.LogRecord(logger_name, logging.INFO, __file__, 0, "", (), None))
+
+    # Records without the field fall back to evenly spaced records.
+    handler.clear()
+    for i in range(4):
+        log.info("No request %d", i)
+    assert [r.message for r in handler.query()] == ["No request 1", "No request 3"]
+
+
+@pytest.mark.parametrize("rate,expected", [(0, 0), (1, 10)])
+def test_bounds(logger_name: str, rate: float, expected: int):
+    """Test dropping or keeping everything.
+
+    :param logger_name: conftest fixture.
+    :param rate: Fraction to keep.
+    :param expected: Number of records kept.
+    """
+    sampling_filter = SamplingFilter(rate=rate, key="request")
+    handler = _init_logger(logger_name, sampling_filter)[0]
+    log = logging.getLogger(logger_name)
+    for i in range(10):
+        with log_context(request=i):
+            log.debug("Message %d", i)
+    assert len(handler) == expected
+
+
+def test_multiple_handlers(logger_name: str):
+    """Test that a record reaching several handlers is decided and counted once.
+
+    :param logger_name: conftest fixture.
+    """
+    sampling_filter = SamplingFilter(rate=0.5)
+    first, second = _init_logger(logger_name, sampling_filter, handlers=2)  # pylint: disable=unbalanced-tuple-unpacking
+    log = logging.getLogger(logger_name)
+    for i in range(10):
+        log.info("Message %d", i)
+
+    assert [r.message for r in first.query()] == [r.message for r in second.query()]
+    assert len(first) == 5
+    assert sampling_filter.sampled_out == {logging.INFO: 5}
+
+
+def test_flush(logger_name: str):
+    """Test logging the summary of dropped records.
+
+    :param logger_name: conftest fixture.
+    """
+    sampling_filter = SamplingFilter(rate=0, logger_name=logger_name)
+    handler = _init_logger(logger_name, sampling_filter)[0]
+    log = logging.getLogger(logger_name)
+    log.debug("Dropped.")
+    log.info("Dropped.")
+    log.info("Dropped.")
+
+    sampling_filter.flush()
+    assert [r.message for r in handler.query()] == ["Sampled out records: 1 DEBUG, 2 INFO"]
+    assert not sampling_filter.sampled_out
+
+    sampling_filter.flush()
+    assert len(handler) == 1
+
+
+def test_invalid():
+    """Test validation."""
+    with pytest.raises(ValueError):
+        SamplingFilter(rate=1.5)
+
+
+def test_install(request: FixtureRequest, logger_name: str):
+    """Test deciding before records are created, keeping the caller of records that are kept.
+
+    :param request: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    sampling_filter = SamplingFilter(rate=0.5)
+    request.addfinalizer(sampling_filter.uninstall)
+    handler = _init_logger(logger_name, SamplingFilter())[0]
+    log = logging.getLogger(logger_name)
+    sampling_filter.install()
+    sampling_filter.install()  # No-op when already installed.
+    factory = logging.getLogRecordFactory()
+    created = []
+    logging.setLogRecordFactory(lambda *args, **kwargs: created.append(factory(*args, **kwargs)) or created[-1])
+    request.addfinalizer(lambda: logging.setLogRecordFactory(factory))
+
+    for i in range(4):
+        log.info("Message %d", i)
+    line = inspect.currentframe().f_lineno - 1
+    log.warning("Warning")
+
+    assert [r.message for r in handler.query()] == ["Message 1", "Message 3", "Warning"]
+    assert len(created) == 3  # Sampled out records are never created.
+    assert [(r.funcName, r.lineno) for r in created] == [("test_install", line)] * 2 + [("test_install", line + 2)]
+    assert sampling_filter.sampled_out == {logging.INFO: 2}
+
+    sampling_filter.uninstall()
+    log.info("Kept.")
+    assert len(handler) == 4
+
+
+def test_context_cached():
+    """Test that the decision per context value is made once."""
+    with log_context(request="abc") as context:
+        keep = context.sample("request", 0.5)
+        context.fields = (("request", "changed"),)  # Never changed in practice, proves the cache is used.
+        assert context.sample("request", 0.5) is keep
+        assert context.sample("other", 0.5) is None
+        assert context.sample("request", 1) is True
+
+
+def test_setup_logging(capsys: CaptureFixture, request: FixtureRequest, logger_name: str):
+    """Test installing the filter through setup_logging, sampling child loggers but not siblings, and uninstalling.
+
+    :param capsys: pytest fixture.
+    :param request: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    request.addfinalizer(WARNINGS_ROUTER.uninstall)
+    request.addfinalizer(lambda: setup_logging(logger_name=logger_name))
+    request.addfinalizer(lambda: setattr(SAMPLING_FILTER, "sampled_out", {}))
+    capture = CaptureHandler()
+    log = setup_logging(logger_name=logger_name, verbose=1, handlers=[capture], sample_rate=0, sample_key="request")
+    child = logging.getLogger(f"{logger_name}.child")
+    sibling_capture = _init_logger(f"{logger_name}_sibling", SamplingFilter())[0]
+    sibling = logging.getLogger(f"{logger_name}_sibling")
+
+    with log_context(request="abc"):
+        log.debug("Dropped.")
+        child.info("Dropped.")
+        sibling.debug("Not sampled.")
+        log.warning("Kept.")
+    assert [r.message for r in capture.query()] == ["Kept."]
+    assert [r.message for r in sibling_capture.query()] == ["Not sampled."]
+    stdout, stderr = capsys.readouterr()
+    assert not stdout
+    assert "Kept." in stderr
+    assert SAMPLING_FILTER.sampled_out == {logging.DEBUG: 1, logging.INFO: 1}
+
+    setup_logging(logger_name=logger_name, verbose=1)
+    log.info("Kept.")
+    child.info("Kept.")
+    assert len(capture) == 3
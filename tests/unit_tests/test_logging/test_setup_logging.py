@@ -8,7 +8,7 @@ from _pytest.capture import CaptureFixture
 from _pytest.fixtures import FixtureRequest
 from _pytest.monkeypatch import MonkeyPatch
 
-from boilerplatepython.logging import LogFormatter, setup_logging
+from boilerplatepython.logging import LogFormatter, setup_logging, WARNINGS_ROUTER
 from .utils import __file__ as utils_filename, generate_log_statements
 
 
@@ -19,6 +19,7 @@ def _reset(request: FixtureRequest):
     :param request: pytest fixture.
     """
     request.addfinalizer(warnings.resetwarnings)
+    request.addfinalizer(WARNINGS_ROUTER.uninstall)
     request.addfinalizer(lambda: logging.disable(logging.NOTSET))
     default_time_format_orig = LogFormatter.default_time_format
     request.addfinalizer(lambda: setattr(LogFormatter, "default_time_format", default_time_format_orig))
@@ -32,7 +33,7 @@ def test_default(capsys: CaptureFixture, logger_name: str):
     :param logger_name: conftest fixture.
     """
     log = setup_logging(logger_name=logger_name)
-    assert not generate_log_statements(log)
+    assert generate_log_statements(log) == ["This thing shouldn't happen."]
     stdout, stderr = [i.splitlines() for i in capsys.readouterr()]
 
     expected_stdout = [
@@ -72,10 +73,7 @@ def test_verbose(capsys: CaptureFixture, logger_name: str, verbose: int):
     :param verbose: Verbosity level.
     """
     log = setup_logging(logger_name=logger_name, verbose=verbose)
-    if verbose == 1:
-        assert not generate_log_statements(log)
-    else:
-        assert generate_log_statements(log) == ["This thing shouldn't happen."]
+    assert generate_log_statements(log) == ["This thing shouldn't happen."]
     stdout, stderr = [i.splitlines() for i in capsys.readouterr()]
 
     expected_stdout = [
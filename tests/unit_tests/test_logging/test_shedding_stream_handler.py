@@ -0,0 +1,148 @@
+"""Tests."""
+import io
+import logging
+import os
+import time
+from typing import List
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.logging import SheddingStreamHandler
+
+
+class SlowStream(io.StringIO):
+    """Stream with slow writes while slow is True."""
+
+    slow = False
+
+    def write(self, s: str) -> int:
+        """Write slowly."""
+        if self.slow:
+            time.sleep(0.02)
+        return super().write(s)
+
+
+def _init_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    """Create a logger for tests."""
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger
+
+
+def _log_all_levels(log: logging.Logger, tag: str):
+    """Log one statement per level."""
+    log.debug("%s", tag)
+    log.info("%s", tag)
+    log.warning("%s", tag)
+
+
+def test_disabled(logger_name: str):
+    """Test nothing is dropped when disabled.
+
+    :param logger_name: conftest fixture.
+    """
+    stream = SlowStream()
+    stream.slow = True
+    log = _init_logger(logger_name, SheddingStreamHandler(stream))
+    for i in range(3):
+        _log_all_levels(log, str(i))
+    assert len(stream.getvalue().splitlines()) == 9
+
+
+def test_slow_writes(monkeypatch: MonkeyPatch, logger_name: str):
+    """Test escalating shedding on slow writes and the summary once writes are fast again.
+
+    :param monkeypatch: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    now = [100.0]
+    monkeypatch.setattr("boilerplatepython.logging.time.monotonic", lambda: now[0])
+    stream = SlowStream()
+    handler = SheddingStreamHandler(stream, slow_write=0.01, cooldown=5)
+    log = _init_logger(logger_name, handler)
+
+    stream.slow = True
+    _log_all_levels(log, "a")  # All written, each slow write escalates.
+    _log_all_levels(log, "b")  # Max pressure.
+    stream.slow = False
+    now[0] += 10
+    _log_all_levels(log, "c")  # Recovered.
+
+    expected = [
+        "DEBUG a",
+        "INFO a",
+        "WARNING a",
+        "WARNING b",
+        "WARNING Dropped records due to slow output: 1 DEBUG, 1 INFO",
+        "DEBUG c",
+        "INFO c",
+        "WARNING c",
+    ]
+    assert stream.getvalue().splitlines() == expected
+    assert handler.pressure == 0
+
+
+def test_full_pipe(monkeypatch: MonkeyPatch, request: FixtureRequest, logger_name: str):
+    """Test shedding while a pipe's buffer is full, without blocking.
+
+    :param monkeypatch: pytest fixture.
+    :param request: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    now = [100.0]
+    monkeypatch.setattr("boilerplatepython.logging.time.monotonic", lambda: now[0])
+    read_fd, write_fd = os.pipe()
+    request.addfinalizer(lambda: os.close(read_fd))
+    stream = os.fdopen(write_fd, "w", buffering=1)
+    request.addfinalizer(stream.close)
+    handler = SheddingStreamHandler(stream, slow_write=10, cooldown=1)
+    log = _init_logger(logger_name, handler)
+
+    # Fill the pipe.
+    os.set_blocking(write_fd, False)
+    filled = 0
+    try:
+        while True:
+            filled += os.write(write_fd, b"x" * 4096)
+    except BlockingIOError:
+        pass
+    os.set_blocking(write_fd, True)
+
+    for i in range(5):
+        log.debug("dropped %d", i)
+        log.info("dropped %d", i)
+    assert handler.pressure == 2
+    assert handler.dropped == {logging.DEBUG: 5, logging.INFO: 5}
+
+    # Drain and recover.
+    drained = b""
+    while len(drained) < filled:
+        drained += os.read(read_fd, 65536)
+    now[0] += 2
+    log.info("kept")
+
+    lines: List[str] = os.read(read_fd, 65536).decode("utf8").splitlines()
+    assert lines == ["WARNING Dropped records due to slow output: 5 DEBUG, 5 INFO", "INFO kept"]
+
+
+@pytest.mark.parametrize("dropped", [True, False])
+def test_summary_on_close(logger_name: str, dropped: bool):
+    """Test that the summary is written when closing.
+
+    :param logger_name: conftest fixture.
+    :param dropped: Simulate dropped records.
+    """
+    stream = SlowStream()
+    handler = SheddingStreamHandler(stream, slow_write=1)
+    _init_logger(logger_name, handler)
+    if dropped:
+        handler.dropped[logging.DEBUG] = 3
+    handler.close()
+
+    expected = ["WARNING Dropped records due to slow output: 3 DEBUG"] if dropped else []
+    assert stream.getvalue().splitlines() == expected
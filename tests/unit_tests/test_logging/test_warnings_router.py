@@ -0,0 +1,106 @@
+"""Tests."""
+import inspect
+import logging
+import warnings
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.fixtures import FixtureRequest
+
+from boilerplatepython.logging import setup_logging, WARNINGS_ROUTER, WarningsRouter
+
+
+@pytest.fixture(autouse=True)
+def _reset(request: FixtureRequest):
+    """Reset global state after each test run.
+
+    :param request: pytest fixture.
+    """
+    request.addfinalizer(warnings.resetwarnings)
+    request.addfinalizer(WARNINGS_ROUTER.uninstall)
+    request.addfinalizer(WARNINGS_ROUTER.flush)
+
+
+@pytest.mark.usefixtures("freeze_time")
+def test_setup_logging(capsys: CaptureFixture, logger_name: str):
+    """Test that warnings are logged once per location followed by occurrence counts.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    setup_logging(logger_name=logger_name, verbose=2)
+    lineno = inspect.currentframe().f_lineno + 2
+    for i in range(25):
+        warnings.warn(f"Repeated {i}.")
+    warnings.warn("Once.", DeprecationWarning)
+    WARNINGS_ROUTER.flush()
+    stderr = capsys.readouterr()[1].splitlines()
+
+    assert stderr == [
+        f"19T21:18:05.415 WARN: {__file__}:{lineno}: UserWarning: Repeated 0.",
+        '  warnings.warn(f"Repeated {i}.")',
+        f"19T21:18:05.415 WARN: {__file__}:{lineno}: UserWarning repeated 10 times",
+        f"19T21:18:05.415 WARN: {__file__}:{lineno + 1}: DeprecationWarning: Once.",
+        '  warnings.warn("Once.", DeprecationWarning)',
+        f"19T21:18:05.415 WARN: {__file__}:{lineno}: UserWarning repeated 25 times",
+    ]
+    assert not WARNINGS_ROUTER.counts
+
+
+def test_quiet(capsys: CaptureFixture, logger_name: str):
+    """Test that warnings are still ignored when quiet.
+
+    :param capsys: pytest fixture.
+    :param logger_name: conftest fixture.
+    """
+    setup_logging(logger_name=logger_name, verbose=-1)
+    with warnings.catch_warnings(record=True) as recorded_warnings:
+        warnings.warn("Ignored.")
+    assert not recorded_warnings
+    assert not any(capsys.readouterr())
+    logging.disable(logging.NOTSET)
+
+
+def test_reload(logger_name: str):
+    """Test that lowering verbosity or leaving quiet mode removes the filter added before.
+
+    :param logger_name: conftest fixture.
+    """
+    before = list(warnings.filters)
+
+    setup_logging(logger_name=logger_name, verbose=2)
+    assert warnings.filters == [("always", None, Warning, None, 0)] + before
+
+    setup_logging(logger_name=logger_name, verbose=0)
+    assert warnings.filters == before
+
+    setup_logging(logger_name=logger_name, verbose=-1)
+    logging.disable(logging.NOTSET)
+    assert warnings.filters == [("ignore", None, Warning, None, 0)] + before
+
+    setup_logging(logger_name=logger_name, verbose=1)
+    assert warnings.filters == before
+
+
+def test_capacity(caplog: pytest.LogCaptureFixture):
+    """Test forgetting the least recently seen locations, logging their unreported counts.
+
+    :param caplog: pytest fixture.
+    """
+    router = WarningsRouter(capacity=2)
+    for lineno in (1, 2, 1, 1, 3):
+        router.showwarning(UserWarning("message"), UserWarning, "file.py", lineno)
+
+    assert list(router.counts.items()) == [((UserWarning, "file.py", 1), 3), ((UserWarning, "file.py", 3), 1)]
+    assert [r.getMessage() for r in caplog.records] == [
+        "file.py:1: UserWarning: message",
+        "file.py:2: UserWarning: message",
+        "file.py:3: UserWarning: message",
+    ]
+
+    caplog.clear()
+    router.showwarning(UserWarning("message"), UserWarning, "file.py", 4)  # Evicts line 1.
+    assert [r.getMessage() for r in caplog.records] == [
+        "file.py:4: UserWarning: message",
+        "file.py:1: UserWarning repeated 3 times",
+    ]
@@ -0,0 +1,33 @@
+"""pytest fixtures and hooks."""
+import pwd
+from pathlib import Path
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+
+@pytest.fixture(autouse=True)
+def _help_cache(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Keep cached help text out of the home directory.
+
+    :param monkeypatch: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def no_home(monkeypatch: MonkeyPatch):
+    """Make the home directory unresolvable, like a user without a passwd entry and no HOME (e.g. in containers).
+
+    :param monkeypatch: pytest fixture.
+    """
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.delenv("HOME", raising=False)
+
+    def getpwuid(uid: int):
+        raise KeyError(f"getpwuid(): uid not found: {uid}")
+
+    monkeypatch.setattr(pwd, "getpwuid", getpwuid)
+    with pytest.raises((KeyError, RuntimeError)):
+        Path.home()
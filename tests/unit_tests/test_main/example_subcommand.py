@@ -0,0 +1,10 @@
+"""Subcommand implementation used by tests, must only be imported when invoked."""
+from typing import List
+
+from boilerplatepython.conf import Config
+
+
+def run(config: Config, args: List[str]) -> int:
+    """Echo arguments and return an exit code."""
+    print(f"{config.command}: {' '.join(args)}")
+    return 3
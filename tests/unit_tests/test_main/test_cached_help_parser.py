@@ -0,0 +1,112 @@
+"""Tests."""
+import argparse
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.__main__ import CachedHelpParser, cli, WideHelpFormatter
+
+
+def _parser() -> CachedHelpParser:
+    """Create a parser with a sub-parser."""
+    parser = CachedHelpParser(prog="test", description="Test.", formatter_class=WideHelpFormatter)
+    parser.add_argument("-a", "--alpha", help="option A")
+    sub_parsers = parser.add_subparsers(dest="sub", help="subcommand")
+    sub_parsers.add_parser("sub", formatter_class=WideHelpFormatter, help="sub help").add_argument("-b", help="option B")
+    return parser
+
+
+def test_cache_hit(monkeypatch: MonkeyPatch):
+    """Test that cache hits return the same text without building a formatter.
+
+    :param monkeypatch: pytest fixture.
+    """
+    monkeypatch.setattr(WideHelpFormatter, "OS_ENVIRON", dict(COLUMNS="100"))
+    parser = _parser()
+    expected_help = argparse.ArgumentParser.format_help(parser)
+    expected_usage = argparse.ArgumentParser.format_usage(parser)
+    assert parser.format_help() == expected_help
+    assert parser.format_usage() == expected_usage
+    assert len(list(CachedHelpParser.cache_dir().iterdir())) == 2
+
+    parser = _parser()  # Building sub-parsers uses the formatter.
+    monkeypatch.setattr(CachedHelpParser, "_get_formatter", lambda _: pytest.fail("formatter built"))
+    assert parser.format_help() == expected_help
+    assert parser.format_usage() == expected_usage
+
+
+@pytest.mark.parametrize("change", ["version", "width", "argument", "sub_argument", "help"])
+def test_cache_miss(monkeypatch: MonkeyPatch, change: str):
+    """Test that anything affecting the rendered text changes the cache key.
+
+    :param monkeypatch: pytest fixture.
+    :param change: What to change.
+    """
+    monkeypatch.setattr(WideHelpFormatter, "OS_ENVIRON", dict(COLUMNS="100"))
+    before = _parser().format_help()
+
+    parser = _parser()
+    if change == "version":
+        monkeypatch.setattr("boilerplatepython.__main__.__version__", "99.0.0")
+    elif change == "width":
+        monkeypatch.setattr(WideHelpFormatter, "OS_ENVIRON", dict(COLUMNS="40"))
+    elif change == "argument":
+        parser.add_argument("-c", help="option C")
+    elif change == "sub_argument":
+        parser._subparsers._group_actions[0].choices["sub"].add_argument("-d")  # pylint: disable=protected-access
+    else:
+        parser._actions[1].help = "changed"  # pylint: disable=protected-access
+
+    assert parser.format_help() == argparse.ArgumentParser.format_help(parser)
+    assert len(list(CachedHelpParser.cache_dir().iterdir())) == 2
+    if change in ("width", "argument", "help"):
+        assert parser.format_help() != before
+
+
+def test_read_only(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Test rendering when the cache directory can't be created.
+
+    :param monkeypatch: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(not_a_dir))
+    parser = _parser()
+    assert parser.format_help() == argparse.ArgumentParser.format_help(parser)
+
+
+@pytest.mark.usefixtures("no_home")
+def test_no_home():
+    """Test rendering without caching when there's no cache directory."""
+    assert CachedHelpParser.cache_dir() is None
+    parser = _parser()
+    assert parser.format_help() == argparse.ArgumentParser.format_help(parser)
+
+
+def test_prune(monkeypatch: MonkeyPatch):
+    """Test removing the oldest entries.
+
+    :param monkeypatch: pytest fixture.
+    """
+    monkeypatch.setattr(CachedHelpParser, "MAX_CACHE_ENTRIES", 3)
+    for columns in range(60, 65):
+        monkeypatch.setattr(WideHelpFormatter, "OS_ENVIRON", dict(COLUMNS=str(columns)))
+        _parser().format_help()
+    assert len(list(CachedHelpParser.cache_dir().iterdir())) == 3
+
+
+def test_cli(capsys: CaptureFixture):
+    """Test cli() help and usage on errors, twice to hit the cache.
+
+    :param capsys: pytest fixture.
+    """
+    for _ in range(2):
+        with pytest.raises(SystemExit):
+            cli(args=["--help"])
+        assert "show this help message and exit" in capsys.readouterr()[0]
+        with pytest.raises(SystemExit):
+            cli(args=["--invalid"])
+        assert capsys.readouterr()[1].startswith("usage: ")
@@ -1,4 +1,5 @@
 """Tests."""
+from pathlib import Path
 from typing import List
 
 import pytest
@@ -9,34 +10,86 @@ from boilerplatepython.__main__ import cli
 
 def test_minimal():
     """Test with no optional arguments."""
-    config = vars(cli(args=[]))
+    config = cli(args=[]).as_dict()
 
     assert config.pop("prog") in ("boilerplatepython", "pytest", "py.test", "_jb_pytest_runner.py")
     assert config.pop("color") is None
+    assert config.pop("command") is None
+    assert config.pop("command_args") == ()
+    assert config.pop("config_file") is None
     assert config.pop("force_wide") is False
+    assert config.pop("log_file") is None
+    assert config.pop("log_file_batch") == 100
+    assert config.pop("log_file_interval") == 50
+    assert config.pop("log_file_wait") is False
+    assert config.pop("log_server") is None
+    assert config.pop("log_server_wait") == 1000
     assert config.pop("quiet") is False
+    assert config.pop("sample_key") is None
+    assert config.pop("sample_rate") == 1.0
+    assert config.pop("shed_after") == 0
     assert config.pop("verbose") == 0
+    assert config.pop("slow_span") == 0
+    assert config.pop("timing") is False
+    assert config.pop("timing_interval") == 0
+    assert config.pop("processes") is False
+    assert config.pop("workers") == 0
 
     assert not config
 
 
-def test_max():
-    """Test with as many optional arguments as possible."""
-    config = vars(
-        cli(
-            args=[
-                "--color=never",
-                "--force-wide",
-                "-vvv",
-            ]
-        )
-    )
+def test_max(tmp_path: Path):
+    """Test with as many optional arguments as possible.
+
+    :param tmp_path: pytest fixture.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\nquiet = yes\n")
+    config = cli(
+        args=[
+            "--color=never",
+            f"--config={config_file}",
+            "--force-wide",
+            f"--log-file={tmp_path / 'log.txt'}",
+            "--log-file-batch=10",
+            "--log-file-interval=5",
+            "--log-file-wait",
+            "--log-server=udp://localhost:514",
+            "--log-server-wait=200",
+            "-vvv",
+            "--jobs=4",
+            "--processes",
+            "--sample-key=request",
+            "--sample-rate=0.25",
+            "--shed-after=50",
+            "--slow-span=100",
+            "--timing",
+            "--timing-interval=60",
+        ]
+    ).as_dict()
 
     assert config.pop("prog") in ("boilerplatepython", "pytest", "py.test", "_jb_pytest_runner.py")
     assert config.pop("color") is False
+    assert config.pop("command") is None
+    assert config.pop("command_args") == ()
+    assert config.pop("config_file") == str(config_file)
     assert config.pop("force_wide") is True
+    assert config.pop("log_file") == str(tmp_path / "log.txt")
+    assert config.pop("log_file_batch") == 10
+    assert config.pop("log_file_interval") == 5
+    assert config.pop("log_file_wait") is True
+    assert config.pop("log_server") == ("udp", "localhost", 514)
+    assert config.pop("log_server_wait") == 200
     assert config.pop("quiet") is False
+    assert config.pop("sample_key") == "request"
+    assert config.pop("sample_rate") == 0.25
+    assert config.pop("shed_after") == 50
     assert config.pop("verbose") == 3
+    assert config.pop("slow_span") == 100
+    assert config.pop("timing") is True
+    assert config.pop("timing_interval") == 60
+    assert config.pop("processes") is True
+    assert config.pop("workers") == 4
 
     assert not config
 
@@ -70,3 +123,54 @@ def test_color_invalid(capsys: CaptureFixture):
 
     stderr = capsys.readouterr()[1]
     assert " invalid choice:" in stderr
+
+
+@pytest.mark.parametrize(
+    "arg",
+    [
+        "--jobs=-1",
+        "--log-file-batch=-1",
+        "--log-file-interval=-1",
+        "--log-server-wait=-1",
+        "--shed-after=-1",
+        "--slow-span=-1",
+        "--timing-interval=-1",
+    ],
+)
+def test_negative_invalid(capsys: CaptureFixture, arg: str):
+    """Test negative numbers.
+
+    :param capsys: pytest fixture.
+    :param arg: Argument to test.
+    """
+    with pytest.raises(SystemExit):
+        cli(args=[arg])
+
+    stderr = capsys.readouterr()[1]
+    assert "must not be negative" in stderr
+
+
+def test_log_server_invalid(capsys: CaptureFixture):
+    """Test invalid value.
+
+    :param capsys: pytest fixture.
+    """
+    with pytest.raises(SystemExit):
+        cli(args=["--log-server", "localhost"])
+
+    stderr = capsys.readouterr()[1]
+    assert "not [tcp://|udp://]host:port: localhost" in stderr
+
+
+@pytest.mark.parametrize("arg", ["--sample-rate=-0.1", "--sample-rate=1.5"])
+def test_sample_rate_invalid(capsys: CaptureFixture, arg: str):
+    """Test out of range fractions.
+
+    :param capsys: pytest fixture.
+    :param arg: Argument to test.
+    """
+    with pytest.raises(SystemExit):
+        cli(args=[arg])
+
+    stderr = capsys.readouterr()[1]
+    assert "argument --sample-rate: must be between 0 and 1" in stderr
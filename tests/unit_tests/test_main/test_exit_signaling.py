@@ -1,4 +1,5 @@
 """Tests."""
+import logging
 import signal
 
 import pytest
@@ -6,12 +7,37 @@ import pytest
 from boilerplatepython.__main__ import ExitSignaling
 
 
-def test():
-    """Test."""
+def test(caplog: pytest.LogCaptureFixture):
+    """Test logging only after leaving the signal handler, since handlers may take locks the main thread held.
+
+    :param caplog: pytest fixture.
+    """
+    caplog.set_level(logging.INFO)
     exit_signaling = ExitSignaling()
     assert exit_signaling.exit_code == 0
+    assert not exit_signaling.stopping.is_set()
 
     with pytest.raises(SystemExit) as exc:
         exit_signaling.exit(signal.SIGTERM, None)
 
     assert exc.value.code == 143
+    assert exit_signaling.stopping.is_set()
+    assert not caplog.records
+
+    exit_signaling.shutdown()
+    exit_signaling.shutdown()
+    assert [r.getMessage() for r in caplog.records] == ["QUITTING 143"]
+
+
+def test_shutdown():
+    """Test running shutdown callbacks once in reverse order, continuing past failures."""
+    exit_signaling = ExitSignaling()
+    called = []
+    exit_signaling.callbacks.append(lambda: called.append(1))
+    exit_signaling.callbacks.append(lambda: 1 / 0)
+    exit_signaling.callbacks.append(lambda: called.append(3))
+
+    exit_signaling.shutdown()
+    exit_signaling.shutdown()
+    assert called == [3, 1]
+    assert exit_signaling.stopping.is_set()
@@ -0,0 +1,148 @@
+"""Tests."""
+import logging
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.__main__ import cli, logging_kwargs, ReloadSignaling
+from boilerplatepython.conf import Config
+from boilerplatepython.logging import HANDLER_NAME_FILE, setup_logging
+
+
+@pytest.fixture(autouse=True)
+def _reset(request: FixtureRequest):
+    """Reset global state after each test run.
+
+    :param request: pytest fixture.
+    """
+    request.addfinalizer(lambda: logging.disable(logging.NOTSET))
+
+
+def test_reload(caplog: pytest.LogCaptureFixture, request: FixtureRequest, tmp_path: Path):
+    """Test reloading the config file and reapplying logging settings in place.
+
+    :param caplog: pytest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    logger_name = f"{__name__}.{request.node.name}"
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\nverbose = 0\n")
+    config = cli(args=[f"--config={config_file}", "--force-wide"])
+    logger = setup_logging(logger_name=logger_name, **logging_kwargs(config))
+    handlers = list(logger.handlers)
+    assert logger.level == logging.INFO
+
+    reload_signaling = ReloadSignaling(config, [lambda c: setup_logging(logger_name=logger_name, **logging_kwargs(c))])
+    config_file.write_text("[boilerplatepython]\nverbose = 1\n")
+    assert reload_signaling.reload()
+
+    assert reload_signaling.config.verbose == 1
+    assert reload_signaling.config.force_wide is True  # CLI arguments are kept.
+    assert config.verbose == 0  # Old snapshot unchanged.
+    assert logger.level == logging.DEBUG
+    assert logger.handlers == handlers  # Reconfigured in place.
+    assert "Reloaded configuration" in caplog.messages
+
+
+def test_reload_invalid(caplog: pytest.LogCaptureFixture, tmp_path: Path):
+    """Test that an invalid config file keeps the current configuration.
+
+    :param caplog: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\nverbose = 2\n")
+    config = cli(args=[f"--config={config_file}"])
+    called = []
+    reload_signaling = ReloadSignaling(config, [called.append])
+
+    config_file.write_text("[boilerplatepython]\nverbose = many\n")
+    assert not reload_signaling.reload()
+
+    assert reload_signaling.config is config
+    assert not called
+    assert "Failed to reload configuration" in caplog.text
+
+
+def test_reload_callback_fails(caplog: pytest.LogCaptureFixture, request: FixtureRequest, tmp_path: Path):
+    """Test that a failing callback keeps the current configuration and reapplies it.
+
+    :param caplog: pytest fixture.
+    :param request: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    logger_name = f"{__name__}.{request.node.name}"
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(f"[boilerplatepython]\nlog_file = {tmp_path / 'log.txt'}\n")
+    config = cli(args=[f"--config={config_file}"])
+    logger = setup_logging(logger_name=logger_name, **logging_kwargs(config))
+    request.addfinalizer(lambda: setup_logging(logger_name=logger_name))
+    applied = []
+
+    def callback(new_config: Config):
+        applied.append(new_config.log_file)
+        setup_logging(logger_name=logger_name, **logging_kwargs(new_config))
+
+    reload_signaling = ReloadSignaling(config, [callback])
+    config_file.write_text(f"[boilerplatepython]\nlog_file = {tmp_path / 'missing' / 'log.txt'}\n")
+    assert not reload_signaling.reload()
+
+    assert reload_signaling.config is config
+    assert applied == [str(tmp_path / "missing" / "log.txt"), str(tmp_path / "log.txt")]
+    assert [h.target for h in logger.handlers if h.get_name() == HANDLER_NAME_FILE] == [str(tmp_path / "log.txt")]
+    assert "Failed to apply reloaded configuration" in caplog.text
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="No SIGHUP on Windows.")
+def test_signal(tmp_path: Path):
+    """Test reloading in the reload thread after receiving SIGHUP.
+
+    :param tmp_path: pytest fixture.
+    """
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[boilerplatepython]\nverbose = 0\n")
+    threads = []
+
+    def callback(_: Config):
+        threads.append(threading.current_thread())
+
+    reload_signaling = ReloadSignaling(cli(args=[f"--config={config_file}"]), [callback])
+    previous = signal.getsignal(signal.SIGHUP)
+    reload_signaling.register()
+    try:
+        config_file.write_text("[boilerplatepython]\nverbose = 1\n")
+        os.kill(os.getpid(), signal.SIGHUP)
+        for _ in range(300):
+            if reload_signaling.config.verbose == 1:
+                break
+            time.sleep(0.01)
+    finally:
+        reload_signaling.unregister()
+        signal.signal(signal.SIGHUP, previous)
+
+    assert reload_signaling.config.verbose == 1
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_register(monkeypatch: MonkeyPatch):
+    """Test signal registration.
+
+    :param monkeypatch: pytest fixture.
+    """
+    registered = {}
+    monkeypatch.setattr("signal.signal", lambda signum, handler: registered.update({signum: handler}))
+    reload_signaling = ReloadSignaling(cli(args=[]))
+    reload_signaling.register()
+    if hasattr(signal, "SIGHUP"):
+        assert registered == {signal.SIGHUP: reload_signaling.request_reload}
+        reload_signaling.unregister()
+        assert registered == {signal.SIGHUP: signal.SIG_DFL}
+    else:
+        assert not registered
@@ -0,0 +1,148 @@
+"""Tests."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.__main__ import cli, main, SubcommandRegistry
+from .test_wide_help_formatter import get_actual
+
+EXAMPLE = f"{__package__}.example_subcommand"
+
+
+def _registry(count: int) -> SubcommandRegistry:
+    """Create a registry with many plugins whose modules don't exist."""
+    manifest = {f"plugin{i}": (f"{EXAMPLE}_missing_{i}:run", f"help for plugin {i}") for i in range(count)}
+    manifest["example"] = (f"{EXAMPLE}:run", "example subcommand")
+    return SubcommandRegistry(manifest)
+
+
+def test_import_count():
+    """Test that the number of modules imported at startup doesn't grow with the number of plugins."""
+    cli(args=[], registry=_registry(1))  # Warm up.
+
+    imported = []
+    for count in (1, 10, 200):
+        before = set(sys.modules)
+        config = cli(args=["-v"], registry=_registry(count))
+        imported.append(set(sys.modules) - before)
+        assert config.command is None
+    assert imported == [set(), set(), set()]
+    assert EXAMPLE not in sys.modules
+
+
+def test_invoke(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
+    """Test that the implementation is imported and run with its arguments when invoked.
+
+    :param capsys: pytest fixture.
+    :param monkeypatch: pytest fixture.
+    """
+    monkeypatch.delitem(sys.modules, EXAMPLE, raising=False)
+    monkeypatch.setattr("boilerplatepython.__main__.SUBCOMMANDS", {"example": (f"{EXAMPLE}:run", "example subcommand")})
+
+    with pytest.raises(SystemExit) as exc:
+        main(args=["-v", "example", "--help", "-x", "y", "--", "-v"], register_exit=False, setup_log=False)
+
+    assert exc.value.code == 3
+    assert capsys.readouterr()[0] == "example: --help -x y -- -v\n"
+    assert EXAMPLE in sys.modules
+
+
+def test_help(capsys: CaptureFixture):
+    """Test subcommands are listed in the help menu before sorted options.
+
+    :param capsys: pytest fixture.
+    """
+    with pytest.raises(SystemExit):
+        cli(args=["--help"], registry=_registry(2))
+    stdout = capsys.readouterr()[0]
+
+    assert "COMMAND ..." in stdout
+    assert "help for plugin 1" in stdout
+    heading = "options:" if "options:" in stdout else "optional arguments:"
+    assert stdout.index("positional arguments:") < stdout.index(heading)
+    actual = get_actual(stdout.replace("options:", "optional arguments:"))
+    assert actual == sorted(actual, key=lambda i: (i.lstrip("-").casefold(), i.lstrip("-").swapcase()))
+
+
+def _mock_entry_points(monkeypatch: MonkeyPatch) -> list:
+    """Replace installed packages' entry points with two subcommands, return a list of calls."""
+    metadata = pytest.importorskip("importlib.metadata")  # Python 3.8+.
+    group = "boilerplatepython.subcommands"
+    entry_points = {
+        group: [
+            metadata.EntryPoint(name="example", value="somewhere.else:run", group=group),
+            metadata.EntryPoint(name="other", value="other.module:main", group=group),
+        ],
+    }
+    calls = []
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda: calls.append(1) or entry_points)
+    return calls
+
+
+def test_discover(monkeypatch: MonkeyPatch):
+    """Test entry point discovery.
+
+    :param monkeypatch: pytest fixture.
+    """
+    _mock_entry_points(monkeypatch)
+
+    registry = _registry(0).discover()
+    assert len(registry) == 2
+    assert registry.subcommands["example"].target == f"{EXAMPLE}:run"  # Manifest wins.
+    assert registry.subcommands["other"].target == "other.module:main"
+    assert "other" not in sys.modules
+
+
+def test_discover_cache(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Test that discovered entry points are cached until a sys.path directory changes.
+
+    :param monkeypatch: pytest fixture.
+    :param tmp_path: pytest fixture.
+    """
+    calls = _mock_entry_points(monkeypatch)
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr(sys, "path", [str(site_packages)])
+
+    assert SubcommandRegistry().discover().subcommands["other"].target == "other.module:main"
+    assert SubcommandRegistry().discover().subcommands["other"].target == "other.module:main"
+    assert len(calls) == 1
+
+    os.utime(site_packages, ns=(1, 1))  # E.g. a package was installed.
+    assert len(SubcommandRegistry().discover()) == 2
+    assert len(calls) == 2
+
+
+@pytest.mark.usefixtures("no_home")
+def test_discover_no_home(monkeypatch: MonkeyPatch):
+    """Test discovering without caching when there's no cache directory.
+
+    :param monkeypatch: pytest fixture.
+    """
+    calls = _mock_entry_points(monkeypatch)
+    assert SubcommandRegistry().discover().subcommands["other"].target == "other.module:main"
+    assert SubcommandRegistry().discover().subcommands["other"].target == "other.module:main"
+    assert len(calls) == 2
+
+
+def test_invalid_target():
+    """Test validation."""
+    with pytest.raises(ValueError):
+        SubcommandRegistry({"bad": ("no_function", "")})
+
+
+def test_completion(capsys: CaptureFixture):
+    """Test subcommands are included in completion scripts.
+
+    :param capsys: pytest fixture.
+    """
+    for shell in ("bash", "fish", "zsh"):
+        with pytest.raises(SystemExit):
+            cli(args=["--completion", shell], registry=_registry(1))
+        script = capsys.readouterr()[0]
+        assert "plugin0" in script
+        assert "example" in script
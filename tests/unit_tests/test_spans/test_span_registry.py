@@ -0,0 +1,145 @@
+"""Tests."""
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from boilerplatepython.spans import span, SpanRegistry, SPANS, SpanStats
+
+
+def test_context_manager_and_decorator():
+    """Test aggregating durations of both forms, including when the timed code raises."""
+    registry = SpanRegistry()
+
+    @registry.span("decorated")
+    def decorated(value: int) -> int:
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    for i in range(3):
+        with registry.span("block"):
+            assert decorated(i) == i
+    with pytest.raises(ValueError):
+        decorated(-1)
+
+    stats = registry.collect()
+    assert sorted(stats) == ["block", "decorated"]
+    assert stats["block"].count == 3
+    assert stats["decorated"].count == 4
+    assert sum(stats["decorated"].buckets) == 4
+    assert 0 <= stats["decorated"].minimum <= stats["decorated"].maximum <= stats["decorated"].total
+    assert not registry.collect()  # Collecting starts a new period.
+
+
+def test_async():
+    """Test decorating coroutine functions and timing concurrent tasks."""
+    registry = SpanRegistry()
+
+    @registry.span("coroutine")
+    async def coroutine():
+        await asyncio.sleep(0.01)
+
+    async def block():
+        with registry.span("block"):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(coroutine(), coroutine(), block(), block())
+
+    asyncio.run(run())
+    stats = registry.collect()
+    assert stats["coroutine"].count == 2
+    assert stats["block"].count == 2
+    assert stats["block"].minimum >= 0.01
+
+
+def test_threads():
+    """Test recording from many threads at once."""
+    registry = SpanRegistry()
+    timed = registry.span("work")(lambda: None)
+    threads = [threading.Thread(target=lambda: [timed() for _ in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.collect()["work"].count == 4000
+
+
+def test_disabled(monkeypatch: MonkeyPatch):
+    """Test that disabled spans don't read the clock or record anything.
+
+    :param monkeypatch: pytest fixture.
+    """
+    registry = SpanRegistry(enabled=False)
+    timed = registry.span("decorated")(lambda: 1)
+    monkeypatch.setattr(time, "perf_counter", lambda: pytest.fail("clock read"))
+    with registry.span("block"):
+        assert timed() == 1
+    assert not registry.collect()
+
+
+def test_percentile():
+    """Test histogram percentile estimates."""
+    stats = SpanStats()
+    for _ in range(98):
+        stats.add(0.000_100)  # 100 us, in the bucket below 128 us.
+    stats.add(0.010)
+    stats.add(0.020)
+    assert stats.percentile(0.5) == 0.000_128
+    assert stats.percentile(0.99) == 0.016_384
+    assert stats.percentile(1) == 0.020  # Capped at the maximum.
+
+
+def test_report(caplog: pytest.LogCaptureFixture):
+    """Test summaries and slow span logging.
+
+    :param caplog: pytest fixture.
+    """
+    registry = SpanRegistry(slow_threshold=0.5)
+    registry.record("fast", 0.001)
+    registry.record("fast", 0.003)
+    registry.record("slow", 0.75)
+    assert [r.getMessage() for r in caplog.records] == ["Slow span slow: 0.750000 s"]
+    assert caplog.records[0].levelno == logging.WARNING
+
+    caplog.clear()
+    registry.report()
+    assert [r.getMessage() for r in caplog.records] == [
+        "Span fast: count=2 total=0.004000s mean=0.002000s min=0.001000s p50<=0.001024s p99<=0.003000s max=0.003000s",
+        "Span slow: count=1 total=0.750000s mean=0.750000s min=0.750000s p50<=0.750000s p99<=0.750000s max=0.750000s",
+    ]
+
+    caplog.clear()
+    registry.report()
+    assert not caplog.records  # Nothing new since the last report.
+
+
+def test_interval_reporting(caplog: pytest.LogCaptureFixture):
+    """Test the reporter thread and the final report on shutdown.
+
+    :param caplog: pytest fixture.
+    """
+    caplog.set_level(logging.INFO)
+    registry = SpanRegistry()
+    registry.start_reporting(0.01)
+    registry.record("first", 0.001)
+    for _ in range(100):
+        if caplog.records:
+            break
+        time.sleep(0.01)
+    registry.record("last", 0.001)
+    registry.shutdown()
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[0].startswith("Span first: count=1 ")
+    assert messages[-1].startswith("Span last: count=1 ")
+
+
+def test_default_registry():
+    """Test that the default registry is disabled until the CLI enables it."""
+    assert SPANS.enabled is False
+    assert span("name").registry is SPANS